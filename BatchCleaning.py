@@ -0,0 +1,208 @@
+"""Clean many workbooks at once with Main.py's cleaning stages.
+
+Every .xlsx file under a directory (or matching a glob) is converted and
+cleaned with one column type spec, in a pool of worker processes. Outputs
+are written to a mirror of the input directory tree, and one report lists
+the text/date/time/number changes of every file. A file that fails is
+reported and does not stop the others. If a worker process dies (e.g. out
+of memory), the pool cannot be used anymore, so the files that had not
+finished are cleaned again one at a time, each in a process of its own.
+
+Workers do not save the Chinese conversion cache; they send the strings
+they converted back with each file's result, and the cache is saved once
+by the batch process at the end.
+
+Example:
+    python BatchCleaning.py --input exports/2024-06-01 --column-types 1:1,2:2,3:3,4:4 --output-dir cleaned/2024-06-01
+
+The settings can also come from a job file (--job), as for Main.py, with
+"input" naming a directory or glob.
+"""
+import os
+import sys
+import io
+import csv
+import glob
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import Main
+from ChineseConverter import ChineseConverter
+from JobSpec import load_job_file, parse_column_types, check_text_settings, parse_switch, parse_worker_count
+
+REPORT_FIELDS = ['file', 'status', 'text', 'date', 'time', 'number', 'total', 'error']
+
+# Converter of each worker process, so its conversion cache is reused across files
+_worker_converter = None
+
+def init_worker():
+    """Create the Chinese converter of a worker process."""
+    global _worker_converter
+    _worker_converter = ChineseConverter()
+
+def find_input_files(source):
+    """Find the workbooks to clean, returning the base directory to mirror and the file list."""
+    if os.path.isdir(source):
+        base_dir = source
+        files = glob.glob(os.path.join(source, '**', '*.xlsx'), recursive=True)
+    else:
+        files = glob.glob(source, recursive=True)
+        base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else os.getcwd()
+    # Skip the lock files Excel leaves next to open workbooks
+    files = [f for f in files if os.path.isfile(f) and not os.path.basename(f).startswith('~$')]
+    return base_dir, sorted(files)
+
+def get_output_path(input_file, base_dir, output_dir):
+    """Place the output at the same relative path under the output directory."""
+    relative_path = os.path.relpath(os.path.abspath(input_file), os.path.abspath(base_dir))
+    return os.path.join(output_dir, relative_path)
+
+def clean_one_file(input_file, output_file, column_types, streaming):
+    """Clean one workbook in a worker process.
+
+    Returns its report row and the conversions the worker made for it, for
+    the batch process to add to the conversion cache.
+    """
+    row = {'file': input_file}
+    try:
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        # Keep the per-file messages out of the batch output
+        with contextlib.redirect_stdout(io.StringIO()):
+            changes = Main.clean_file(input_file, output_file, column_types, streaming, _worker_converter, save_cache=False)
+        row.update(changes)
+        row['total'] = sum(changes.values())
+        row['status'] = 'ok'
+    except Exception as e:
+        row['status'] = 'failed'
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row, _worker_converter.take_new_entries()
+
+def failed_row(input_file, error):
+    """Build the report row of a file whose worker could not return a result."""
+    return {'file': input_file, 'status': 'failed', 'error': f"{type(error).__name__}: {error}"}
+
+def clean_in_pool(files, base_dir, output_dir, column_types, streaming, workers, converter, rows, total):
+    """Clean files in one process pool, adding their report rows to rows.
+
+    Stops early if a worker process dies, as the pool then fails every file
+    that has not finished; those files are left out of rows.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = {
+            pool.submit(clean_one_file, f, get_output_path(f, base_dir, output_dir), column_types, streaming): f
+            for f in files
+        }
+        for future in as_completed(futures):
+            input_file = futures[future]
+            try:
+                row, entries = future.result()
+            except BrokenProcessPool:
+                return
+            except Exception as e:
+                row, entries = failed_row(input_file, e), {}
+            converter.merge_entries(entries)
+            rows[input_file] = row
+            print(f"[{len(rows)}/{total}] {row['status']}: {input_file}")
+
+def run_batch(files, base_dir, output_dir, column_types, streaming=False, workers=None):
+    """Clean every file in a process pool, returning the report rows in file order."""
+    rows = {}
+    # Collects the workers' conversions, saved to the conversion cache once at the end
+    converter = ChineseConverter()
+    clean_in_pool(files, base_dir, output_dir, column_types, streaming, workers, converter, rows, len(files))
+
+    unfinished = [f for f in files if f not in rows]
+    if unfinished:
+        print(f"A worker process died; cleaning the {len(unfinished)} unfinished files again one at a time.")
+    for input_file in unfinished:
+        # A pool of one process per file, so a file that kills its worker only fails itself
+        clean_in_pool([input_file], base_dir, output_dir, column_types, streaming, 1, converter, rows, len(files))
+        if input_file not in rows:
+            rows[input_file] = failed_row(input_file, BrokenProcessPool("the worker process died while cleaning this file"))
+            print(f"[{len(rows)}/{len(files)}] failed: {input_file}")
+
+    converter.save_cache()
+    return [rows[f] for f in files]
+
+def write_report(rows, report_file):
+    """Write the per-file change counts to a CSV report."""
+    with open(report_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field, '') for field in REPORT_FIELDS})
+
+def print_report(rows):
+    """Print the total changes over all files and list the failed ones."""
+    succeeded = [row for row in rows if row['status'] == 'ok']
+    failed = [row for row in rows if row['status'] != 'ok']
+    totals = Main.new_change_counters()
+    for row in succeeded:
+        for counter in totals:
+            totals[counter] += row[counter]
+
+    print(f"\nFiles cleaned: {len(succeeded)}, failed: {len(failed)}")
+    Main.print_total_changes(totals)
+    if failed:
+        print("\nFailed files:")
+        for row in failed:
+            print(f"- {row['file']}: {row['error']}")
+
+def parse_args(argv):
+    """Read the batch settings from a job file and/or command line flags."""
+    parser = argparse.ArgumentParser(description="Clean every Excel file in a directory with Main.py's cleaning stages.")
+    parser.add_argument('--job', help="JSON or YAML job spec file (flags override its settings)")
+    parser.add_argument('--input', help="directory of .xlsx files, or a glob such as 'exports/*/*.xlsx'")
+    parser.add_argument('--column-types',
+                        help="column data types as column:type pairs, e.g. 1:1,2:2,3:3 "
+                             "(1 Text, 2 Date, 3 Time, 4 Number, 5 None)")
+    parser.add_argument('--output-dir', help="directory that mirrors the input tree with the cleaned files")
+    parser.add_argument('--report', help="CSV change report (default: cleaning_report.csv in the output directory)")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument('--streaming', action='store_true', default=None,
+                        help="use the streaming mode for large files (cell formatting is not kept)")
+    args = parser.parse_args(argv)
+
+    job = {}
+    if args.job:
+        try:
+            job = load_job_file(args.job)
+        except (OSError, ValueError) as e:
+            parser.error(f"Could not read job file: {e}")
+    for key, value in vars(args).items():
+        if key != 'job' and value is not None:
+            job[key] = value
+
+    missing = [key for key in ['input', 'column_types', 'output_dir'] if not job.get(key)]
+    if missing:
+        parser.error("Missing job settings: " + ", ".join(missing))
+    try:
+        check_text_settings(job, ['input', 'output_dir', 'report'])
+        job['column_types'] = parse_column_types(job['column_types'])
+        job['streaming'] = parse_switch(job.get('streaming', False), 'streaming')
+        if job.get('workers') is not None:
+            job['workers'] = parse_worker_count(job['workers'])
+    except ValueError as e:
+        parser.error(str(e))
+    job.setdefault('report', os.path.join(job['output_dir'], 'cleaning_report.csv'))
+    return job
+
+def main(argv=None):
+    job = parse_args(sys.argv[1:] if argv is None else argv)
+
+    base_dir, files = find_input_files(job['input'])
+    if not files:
+        print(f"No .xlsx files found for '{job['input']}'.")
+        return
+    print(f"Cleaning {len(files)} files from '{base_dir}' into '{job['output_dir']}'")
+
+    os.makedirs(job['output_dir'], exist_ok=True)
+    rows = run_batch(files, base_dir, job['output_dir'], job['column_types'], job['streaming'], job.get('workers'))
+    write_report(rows, job['report'])
+    print_report(rows)
+    print(f"\nChange report saved to: {job['report']}")
+
+if __name__ == "__main__":
+    main()
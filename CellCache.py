@@ -0,0 +1,48 @@
+"""Distinct-value memoization for the cell cleaners.
+
+Date, time and product columns hold few distinct values, so every cleaner
+wrapped here normalizes each distinct raw value once and returns the cached
+result for every other cell holding the same value. Caches are bounded LRUs
+and keep hit/miss statistics for the end-of-run summary. They are not
+cleared between files, as the same values recur across files.
+"""
+from functools import lru_cache
+
+# Maximum number of distinct values kept per cleaner
+CACHE_SIZE = 65536
+
+# Memoized cleaners by name, reported by print_cache_stats()
+_caches = {}
+
+def memoize(func, name=None, maxsize=CACHE_SIZE):
+    """Wrap a one-argument cleaner in a bounded LRU cache and register it for the summary.
+
+    Values of different types are cached separately (1, 1.0 and True are not
+    mixed up), so the result is always the one the cleaner would return.
+    """
+    cached = lru_cache(maxsize=maxsize, typed=True)(func)
+    _caches[name or func.__name__] = cached
+    return cached
+
+def memoize_cleaner(func):
+    """Decorator form of memoize() with the default cache size."""
+    return memoize(func)
+
+def get_cache_stats():
+    """Get (name, hits, misses, cached values) for every cache that has been used."""
+    stats = []
+    for name, cached in _caches.items():
+        info = cached.cache_info()
+        if info.hits or info.misses:
+            stats.append((name, info.hits, info.misses, info.currsize))
+    return stats
+
+def print_cache_stats():
+    """Print hit/miss statistics of the cleaner caches."""
+    stats = get_cache_stats()
+    if not stats:
+        return
+    print("\nCache statistics:")
+    for name, hits, misses, size in stats:
+        hit_rate = hits / (hits + misses)
+        print(f"{name}: {hits} hits, {misses} misses ({hit_rate:.1%} hit rate, {size} distinct values cached)")
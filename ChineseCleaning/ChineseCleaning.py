@@ -1,6 +1,11 @@
 import openpyxl
-from opencc import OpenCC
 import os
+import sys
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChineseConverter import ChineseConverter
 
 def get_input_file(default_directory):
     """Prompt user to input the name of the Excel file."""
@@ -26,31 +31,49 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
-def convert_simplified_to_traditional(input_file, output_file):
-    """Convert Simplified Chinese text in an Excel file to Traditional Chinese."""
-    cc = OpenCC('s2t')  # 's2t' stands for Simplified to Traditional
+def get_worker_count():
+    """Prompt user for the number of worker processes used to convert sheets."""
+    while True:
+        workers_input = input("Enter the number of worker processes for converting sheets in parallel (or '1' to convert them one by one): ")
+        try:
+            workers = int(workers_input)
+            if workers >= 1:
+                return workers
+        except ValueError:
+            pass
+        print("Please enter a whole number of at least 1.")
+
+def convert_simplified_to_traditional(input_file, output_file, workers=1):
+    """Convert Simplified Chinese text in an Excel file to Traditional Chinese.
+
+    With more than one worker, the sheets are converted in parallel worker
+    processes and merged back before the workbook is saved once.
+    """
+    converter = ChineseConverter('s2t')  # 's2t' stands for Simplified to Traditional
 
     # Load the workbook
     wb = openpyxl.load_workbook(input_file)
 
-    # Iterate through all sheets in the workbook
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]  # Select each worksheet
+    if workers > 1:
+        # Convert the sheets in parallel worker processes
+        converter.convert_workbook_parallel(wb, workers)
+        for sheet in wb.sheetnames:
+            print(f"Converted data in sheet: {sheet}")
+    else:
+        # Iterate through all sheets in the workbook
+        for sheet in wb.sheetnames:
+            ws = wb[sheet]  # Select each worksheet
 
-        # Iterate through all rows and columns in the sheet
-        for row in ws.iter_rows():
-            for cell in row:
-                if isinstance(cell.value, str):  # Check if the cell contains text
-                    original_text = cell.value
-                    # Convert Simplified Chinese to Traditional Chinese
-                    converted_text = cc.convert(original_text)
-                    cell.value = converted_text  # Update the cell value
+            # Convert each distinct text in the sheet once and update every cell holding it
+            converter.convert_worksheet(ws)
 
-        print(f"Converted data in sheet: {sheet}")
+            print(f"Converted data in sheet: {sheet}")
 
     # Save the changes to a new Excel file
     wb.save(output_file)
     print(f"Converted Simplified Chinese to Traditional Chinese and saved to {output_file}")
+    converter.print_stats()
+    converter.save_cache()
 
 def main():
     """Main execution flow."""
@@ -62,9 +85,10 @@ def main():
 
     # Get output file details from user
     output_excel_file = get_output_file_details(default_directory)
+    workers = get_worker_count()
 
     # Call the conversion function with user-specified file name
-    convert_simplified_to_traditional(input_excel_file, output_excel_file)
+    convert_simplified_to_traditional(input_excel_file, output_excel_file, workers)
 
 # Run the main function if this script is executed
 if __name__ == "__main__":
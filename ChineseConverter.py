@@ -0,0 +1,256 @@
+"""Shared Simplified to Traditional Chinese conversion service.
+
+Every tool that converts cells goes through ChineseConverter, which
+- converts each distinct string only once per sheet,
+- sends the distinct strings that are not cached yet to OpenCC in large
+  batched calls, joined with a delimiter and split back afterwards,
+- keeps the results, with the '餅幹' -> '餅乾' fix already applied, in a
+  persistent on-disk cache, so later runs only convert new strings. The
+  cache keeps the MAX_CACHE_ENTRIES most recently used strings and is only
+  rewritten when a run converted something new.
+
+The cost of conversion therefore grows with the vocabulary, not the number
+of cells. Workbooks with many sheets can also be converted with one worker
+process per sheet through convert_workbook_parallel().
+"""
+import os
+import json
+import tempfile
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import opencc
+from opencc import OpenCC
+
+DEFAULT_CACHE_FILE = "s2t_cache.json"
+
+# Bump when the post-conversion fixes change, so old cached results are dropped
+CACHE_VERSION = 1
+
+# Private-use character that never appears in OpenCC dictionaries, so a phrase
+# can never be matched across two joined strings
+BATCH_DELIMITER = '\uE000'
+
+# Maximum number of characters sent to OpenCC in one call
+BATCH_CHARS = 1_000_000
+
+# Maximum number of strings kept in the on-disk cache; the least recently used go first
+MAX_CACHE_ENTRIES = 200_000
+
+# Post-conversion fixes: (wrong, right)
+SPECIAL_FIXES = [('餅幹', '餅乾')]
+
+def apply_special_fixes(converted_text):
+    """Apply the post-conversion fixes, returning the text and whether any fix applied."""
+    special = False
+    for wrong, right in SPECIAL_FIXES:
+        if wrong in converted_text:
+            converted_text = converted_text.replace(wrong, right)
+            special = True
+    return converted_text, special
+
+# Converter of each worker process, created by init_worker()
+_worker_converter = None
+
+def init_worker(config):
+    """Create the OpenCC converter of a worker process."""
+    global _worker_converter
+    _worker_converter = ChineseConverter(config, cache_file=None)
+
+def convert_in_worker(texts):
+    """Convert a sheet's strings in a worker process, returning (converted text, special) pairs."""
+    return [apply_special_fixes(text) for text in _worker_converter.convert_batch(texts)]
+
+class ChineseConverter:
+    """Batched, cached OpenCC conversion of spreadsheet strings."""
+
+    def __init__(self, config='s2t', cache_file=DEFAULT_CACHE_FILE):
+        self.config = config
+        self.cache_file = cache_file
+        self.cc = OpenCC(config)
+        # text -> (converted text, whether a special fix applied)
+        self.cache = self.load_cache()
+        # Strings converted since the last take_new_entries()
+        self.new_texts = []
+        self.dirty = False
+        self.cache_hits = 0
+        self.converted = 0
+
+    def cache_key(self):
+        """Identify the conversion rules that produced the cached results."""
+        return {"version": CACHE_VERSION, "config": self.config, "opencc": opencc.__version__}
+
+    def load_cache(self):
+        """Load cached conversions from disk, ignoring caches made with other rules."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read conversion cache '{self.cache_file}': {e}")
+            return {}
+        if data.get("key") != self.cache_key():
+            return {}
+        return {text: (converted, bool(special)) for text, (converted, special) in data["entries"].items()}
+
+    def save_cache(self):
+        """Write the conversion cache to disk if anything new was converted.
+
+        The cache is written to a temporary file of its own and then moved into
+        place, so processes saving at the same time never share a temporary
+        file. A failed save only prints a warning, as the cache can be rebuilt.
+        """
+        if not self.cache_file or not self.dirty:
+            return
+        # The cache is kept in least recently used first order
+        excess = len(self.cache) - MAX_CACHE_ENTRIES
+        if excess > 0:
+            for text in list(islice(self.cache, excess)):
+                del self.cache[text]
+        data = {
+            "key": self.cache_key(),
+            "entries": {text: [converted, int(special)] for text, (converted, special) in self.cache.items()}
+        }
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        temp_file = None
+        try:
+            fd, temp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.cache_file) + '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Could not save conversion cache '{self.cache_file}': {e}")
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def take_new_entries(self):
+        """Get {text: (converted text, special)} for the strings converted since the last call."""
+        entries = {text: self.cache[text] for text in self.new_texts}
+        self.new_texts = []
+        return entries
+
+    def merge_entries(self, entries):
+        """Add conversions made by another converter, e.g. in a worker process, to the cache."""
+        for text, result in entries.items():
+            if text not in self.cache:
+                self.cache[text] = result
+                self.dirty = True
+
+    def convert_batch(self, texts):
+        """Convert a list of strings with as few OpenCC calls as possible, keeping their order."""
+        results = []
+        batch = []
+        batch_chars = 0
+        for text in texts:
+            if BATCH_DELIMITER in text or batch_chars >= BATCH_CHARS:
+                results.extend(self.convert_joined(batch))
+                batch = []
+                batch_chars = 0
+            if BATCH_DELIMITER in text:
+                # Cannot be joined safely; convert on its own
+                results.append(self.cc.convert(text))
+                continue
+            batch.append(text)
+            batch_chars += len(text) + 1
+        results.extend(self.convert_joined(batch))
+        return results
+
+    def convert_joined(self, texts):
+        """Convert strings in one OpenCC call by joining them with the delimiter."""
+        if not texts:
+            return []
+        converted = self.cc.convert(BATCH_DELIMITER.join(texts)).split(BATCH_DELIMITER)
+        if len(converted) != len(texts):
+            # The delimiter did not survive conversion; fall back to one call per string
+            return [self.cc.convert(text) for text in texts]
+        return converted
+
+    def find_missing(self, distinct):
+        """Get the distinct strings that are not cached yet, counting the others as cache hits."""
+        missing = []
+        for text in distinct:
+            result = self.cache.pop(text, None)
+            if result is None:
+                missing.append(text)
+            else:
+                # Move the hit to the most recently used end
+                self.cache[text] = result
+        self.cache_hits += len(distinct) - len(missing)
+        return missing
+
+    def store_results(self, texts, results):
+        """Add (converted text, special) results for newly converted strings to the cache."""
+        for text, result in zip(texts, results):
+            if text not in self.cache:
+                self.cache[text] = result
+                self.new_texts.append(text)
+                self.converted += 1
+                self.dirty = True
+
+    def convert_many(self, texts):
+        """Convert strings, returning {text: (converted text, special fix applied)} for the distinct ones."""
+        distinct = set(texts)
+        missing = self.find_missing(distinct)
+        if missing:
+            self.store_results(missing, [apply_special_fixes(text) for text in self.convert_batch(missing)])
+        return {text: self.cache[text] for text in distinct}
+
+    def convert(self, text):
+        """Convert a single string, returning (converted text, special fix applied)."""
+        result = self.cache.pop(text, None)
+        if result is not None:
+            # Move the hit to the most recently used end
+            self.cache[text] = result
+            self.cache_hits += 1
+            return result
+        return self.convert_many([text])[text]
+
+    def convert_cells(self, cells):
+        """Convert every string cell in place, returning the number of special fixes applied."""
+        cells = [cell for cell in cells if isinstance(cell.value, str)]
+        results = self.convert_many(cell.value for cell in cells)
+        special_changes = 0
+        for cell in cells:
+            cell.value, special = results[cell.value]
+            special_changes += special
+        return special_changes
+
+    def convert_worksheet(self, ws):
+        """Convert every string cell of a worksheet, returning the number of special fixes applied."""
+        return self.convert_cells(cell for row in ws.iter_rows() for cell in row)
+
+    def convert_workbook_parallel(self, wb, workers):
+        """Convert every sheet of a workbook, converting each sheet's new strings in a worker process.
+
+        The results are merged back into the workbook in the parent process, so
+        the output is the same as converting the sheets one after another.
+        Returns {sheet title: number of special fixes applied}.
+        """
+        sheet_cells = {}
+        jobs = []
+        # Strings already sent to a worker for an earlier sheet
+        pending = set()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(self.config,)) as pool:
+            for ws in wb.worksheets:
+                cells = [cell for row in ws.iter_rows() for cell in row if isinstance(cell.value, str)]
+                sheet_cells[ws.title] = cells
+                missing = self.find_missing({cell.value for cell in cells} - pending)
+                pending.update(missing)
+                if missing:
+                    jobs.append((missing, pool.submit(convert_in_worker, missing)))
+
+            for missing, future in jobs:
+                self.store_results(missing, future.result())
+
+        special_changes = {}
+        for title, cells in sheet_cells.items():
+            special_changes[title] = 0
+            for cell in cells:
+                cell.value, special = self.cache[cell.value]
+                special_changes[title] += special
+        return special_changes
+
+    def print_stats(self):
+        """Print how many strings came from the cache and how many had to be converted."""
+        print(f"OpenCC {self.config}: {self.cache_hits} cache hits, {self.converted} strings converted")
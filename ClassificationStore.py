@@ -0,0 +1,107 @@
+"""SQLite store of product classifications shared by Classify.py and SmartTag.py.
+
+Classifications live in classifications.db (WAL mode, so several
+classifier processes can read and write it at the same time). Every change
+is an upsert of one row, lookups go through the primary key index, and
+category counts are computed in SQL. An existing classifications.txt is
+imported the first time the database is created; item names may contain
+colons, as only the last one separates the category.
+"""
+import os
+from SQLiteStore import connect, lookup_keys
+
+DEFAULT_DB_FILE = "classifications.db"
+LEGACY_FILE = "classifications.txt"
+
+def read_legacy_classifications(filename):
+    """Read {item: category} from the old 'item:category' text file, skipping malformed lines."""
+    classifications = {}
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            stripped_line = line.strip()
+            if not stripped_line:
+                continue
+            item, separator, category = stripped_line.rpartition(':')
+            if not separator or not item or not category:
+                print(f"Warning: Skipping malformed line: '{stripped_line}'")
+                continue
+            classifications[item] = category
+    return classifications
+
+class ClassificationStore:
+    """Item -> category mapping backed by SQLite."""
+
+    def __init__(self, db_file=DEFAULT_DB_FILE, legacy_file=LEGACY_FILE):
+        self.db_file = db_file
+        is_new = not os.path.exists(db_file)
+        self.conn = connect(db_file)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS classifications (item TEXT PRIMARY KEY, category TEXT NOT NULL)")
+        self.conn.commit()
+        if is_new and legacy_file and os.path.exists(legacy_file):
+            imported = self.set_many(read_legacy_classifications(legacy_file).items())
+            print(f"Imported {imported} classifications from {legacy_file} into {db_file}")
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    def __contains__(self, item):
+        return self.get(item) is not None
+
+    def get(self, item, default=None):
+        """Get the category of an item."""
+        row = self.conn.execute("SELECT category FROM classifications WHERE item = ?", (str(item),)).fetchone()
+        return row[0] if row else default
+
+    def set(self, item, category):
+        """Add or change the category of an item."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO classifications (item, category) VALUES (?, ?) "
+                "ON CONFLICT(item) DO UPDATE SET category = excluded.category",
+                (str(item), category))
+
+    def set_many(self, pairs):
+        """Add or change the categories of (item, category) pairs in one transaction, returning how many."""
+        pairs = [(str(item), category) for item, category in pairs]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO classifications (item, category) VALUES (?, ?) "
+                "ON CONFLICT(item) DO UPDATE SET category = excluded.category",
+                pairs)
+        return len(pairs)
+
+    def delete(self, item):
+        with self.conn:
+            self.conn.execute("DELETE FROM classifications WHERE item = ?", (str(item),))
+
+    def clear(self):
+        """Remove every classification."""
+        with self.conn:
+            self.conn.execute("DELETE FROM classifications")
+
+    def items(self):
+        """Get every (item, category) pair in the order they were first classified."""
+        return self.conn.execute("SELECT item, category FROM classifications ORDER BY rowid").fetchall()
+
+    def lookup(self, items):
+        """Get {item: category} for the classified ones among items, keyed by the items as given."""
+        return lookup_keys(self.conn, "SELECT item, category FROM classifications WHERE item IN ({placeholders})",
+                           items)
+
+    def count_categories(self, items):
+        """Count the items of each category in SQL, in the order the categories first appear among items.
+
+        Unclassified items are not counted.
+        """
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS count_items (item TEXT)")
+            self.conn.execute("DELETE FROM count_items")
+            self.conn.executemany("INSERT INTO count_items (item) VALUES (?)", ((str(item),) for item in items))
+            counts = self.conn.execute(
+                "SELECT c.category, COUNT(*) FROM count_items t JOIN classifications c ON c.item = t.item "
+                "GROUP BY c.category ORDER BY MIN(t.rowid)").fetchall()
+            self.conn.execute("DELETE FROM count_items")
+        return counts
@@ -1,30 +1,71 @@
-from openpyxl import load_workbook
+import csv
 from collections import Counter
-import os
+from openpyxl import Workbook
+from ColumnCache import ColumnCache
+from ClassificationStore import ClassificationStore
 
 def save_classifications(classifications, filename="classifications.txt"):
-    """Save classifications to a text file with UTF-8 encoding."""
+    """Export classifications to a text file with UTF-8 encoding."""
     with open(filename, 'w', encoding='utf-8') as file:
         for item, category in classifications.items():
             file.write(f"{item}:{category}\n")
-    print("Classifications saved to", filename)
+    print("Classifications exported to", filename)
 
-def load_classifications(filename="classifications.txt"):
-    """Load classifications from a text file."""
-    if not os.path.exists(filename):
-        return {}
-    
-    classifications = {}
-    with open(filename, 'r', encoding='utf-8') as file:
-        for line in file:
-            item, category = line.strip().split(':')
-            classifications[item] = category
-    print("Classifications loaded from", filename)
-    return classifications
+def select_column(column_cache):
+    """Ask for an Excel file and column number, returning the column's (header, values) or None if they are invalid."""
+    file_name = input("Enter the name of the Excel file (with .xlsx extension): ")
+    try:
+        headers = column_cache.get_headers(file_name)
+        print("Available columns:", headers)
+        
+        column_number = int(input("Enter the column number (starting from 1): "))
+        
+        if 1 <= column_number <= len(headers):
+            return headers[column_number - 1], column_cache.get_column(file_name, column_number)
+        print("Invalid column number.")
+    except FileNotFoundError:
+        print(f"Error: The file '{file_name}' was not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    return None
+
+def map_categories(values, classifications):
+    """Get the category of every value, looking up each distinct item once ('' for empty cells)."""
+    found = classifications.lookup(set(item for item in values if item is not None))
+    return ['' if item is None else found.get(item, "Unclassified") for item in values]
+
+def count_by_category(values, classifications):
+    """Count the classified items per category, looking up each distinct item once and weighting it by its frequency."""
+    frequencies = Counter(item for item in values if item is not None)
+    found = classifications.lookup(frequencies)
+    counts = Counter()
+    for item, frequency in frequencies.items():
+        category = found.get(item)
+        if category:
+            counts[category] += frequency
+    return counts
+
+def write_categories(header, values, categories, output_file):
+    """Write the items and their categories as two columns of a new workbook, or a CSV file."""
+    rows = zip(values, categories)
+    if output_file.lower().endswith('.csv'):
+        with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([header, 'Category'])
+            writer.writerows(rows)
+    else:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append([header, 'Category'])
+        for row in rows:
+            ws.append(row)
+        wb.save(output_file)
 
 def classify_products():
     """Classify products as Food, Drink, or Others based on user input from an Excel file."""
-    classifications = load_classifications()  # Load existing classifications
+    classifications = ClassificationStore()  # Existing classifications, saved as they change
+    # Columns read so far, reused by the menu options
+    column_cache = ColumnCache()
     classification_map = {
         'f': 'Food',
         'd': 'Drink',
@@ -45,41 +86,28 @@ def classify_products():
         
         if choice == '0':
             # Classify products
-            file_name = input("Enter the name of the Excel file (with .xlsx extension): ")
+            column = select_column(column_cache)
+            if column is None:
+                continue
+            _, values = column
             try:
-                # Load the Excel workbook
-                wb = load_workbook(file_name)
-                sheet = wb.active  # Get the active sheet
-                print("Available columns:", [sheet.cell(row=1, column=i).value for i in range(1, sheet.max_column + 1)])
+                # Extract unique items from the designated column
+                items = set(item for item in values if item is not None)
                 
-                column_number = int(input("Enter the column number (starting from 1): "))
+                # Ask user to classify each unique item
+                for item in items:
+                    classification = input(f"Is '{item}' food (f), drink (d), or others (o)? ").strip().lower()
+                    while classification not in classification_map.keys():
+                        classification = input(f"Invalid input. Please enter {', '.join(classification_map.keys())}: ").strip().lower()
+                    classifications.set(item, classification_map[classification])
                 
-                # Extract unique items from the designated column
-                if 1 <= column_number <= sheet.max_column:
-                    items = set()
-                    for row in range(2, sheet.max_row + 1):  # Start from row 2 to skip header
-                        item = sheet.cell(row=row, column=column_number).value
-                        if item is not None:
-                            items.add(item)
-                    
-                    # Ask user to classify each unique item
-                    for item in items:
-                        classification = input(f"Is '{item}' food (f), drink (d), or others (o)? ").strip().lower()
-                        while classification not in classification_map.keys():
-                            classification = input(f"Invalid input. Please enter {', '.join(classification_map.keys())}: ").strip().lower()
-                        classifications[item] = classification_map[classification]
-                    
-                    print("Classifications saved.")
-                else:
-                    print("Invalid column number.")
-            except FileNotFoundError:
-                print(f"Error: The file '{file_name}' was not found.")
+                print("Classifications saved.")
             except Exception as e:
                 print(f"An error occurred: {e}")
 
         elif choice == '1':
             # View classifications
-            if not classifications:
+            if not len(classifications):
                 print("No classifications available. Please classify products first.")
                 continue
             
@@ -88,55 +116,35 @@ def classify_products():
         
         elif choice == '2':
             # Output classifications from Excel
-            file_name = input("Enter the name of the Excel file (with .xlsx extension): ")
-            try:
-                wb = load_workbook(file_name)
-                sheet = wb.active  # Get the active sheet
-                print("Available columns:", [sheet.cell(row=1, column=i).value for i in range(1, sheet.max_column + 1)])
-                
-                column_number = int(input("Enter the column number (starting from 1): "))
-                
-                if 1 <= column_number <= sheet.max_column:
-                    for row in range(2, sheet.max_row + 1):  # Start from row 2 to skip header
-                        item = sheet.cell(row=row, column=column_number).value
-                        if item is not None:
-                            category = classifications.get(item, "Unclassified")
-                            print(f"{item} is classified as {category}.")
-                else:
-                    print("Invalid column number.")
-            except FileNotFoundError:
-                print(f"Error: The file '{file_name}' was not found.")
-            except Exception as e:
-                print(f"An error occurred: {e}")
+            column = select_column(column_cache)
+            if column is None:
+                continue
+            header, values = column
+            categories = map_categories(values, classifications)
+            
+            output_file = input("Enter a file to write the categories to (.xlsx or .csv), or press Enter to print them: ").strip()
+            if output_file:
+                try:
+                    write_categories(header, values, categories, output_file)
+                    print(f"Categories of {len(values)} rows written to {output_file}")
+                except Exception as e:
+                    print(f"An error occurred: {e}")
+                continue
+            for item, category in zip(values, categories):
+                if item is not None:
+                    print(f"{item} is classified as {category}.")
 
         elif choice == '3':
             # Count classifications from an Excel file and designated column
-            file_name = input("Enter the name of the Excel file (with .xlsx extension): ")
-            try:
-                wb = load_workbook(file_name)
-                sheet = wb.active  # Get the active sheet
-                print("Available columns:", [sheet.cell(row=1, column=i).value for i in range(1, sheet.max_column + 1)])
-                
-                column_number = int(input("Enter the column number (starting from 1): "))
-                
-                if 1 <= column_number <= sheet.max_column:
-                    counts = Counter()
-                    for row in range(2, sheet.max_row + 1):  # Start from row 2 to skip header
-                        item = sheet.cell(row=row, column=column_number).value
-                        if item is not None:
-                            category = classifications.get(item)
-                            if category: 
-                                counts[category] += 1
-                    
-                    print("\nClassification Counts:")
-                    for category, count in counts.items():
-                        print(f"{category}: {count}")
-                else:
-                    print("Invalid column number.")
-            except FileNotFoundError:
-                print(f"Error: The file '{file_name}' was not found.")
-            except Exception as e:
-                print(f"An error occurred: {e}")
+            column = select_column(column_cache)
+            if column is None:
+                continue
+            _, values = column
+            counts = count_by_category(values, classifications)
+            
+            print("\nClassification Counts:")
+            for category, count in counts.items():
+                print(f"{category}: {count}")
 
         elif choice == '4':
             # Manage classifications (add or delete)
@@ -165,8 +173,8 @@ def classify_products():
                 print("Invalid action. Please enter 'a' to add or 'd' to delete.")
 
         elif choice == '5':
-            # Save classifications to a text file
-            save_classifications(classifications)
+            # Classifications are saved as they change; also export them to a text file
+            save_classifications(dict(classifications.items()))
 
         elif choice == '6':
             print("Exiting the program.")
@@ -0,0 +1,48 @@
+"""Session cache of spreadsheet columns for the menu-driven tools.
+
+The first time a column of a file is needed it is read once, in read-only
+mode, as a plain list of values; later menu options on the same file and
+column reuse that list. Entries are keyed by the file's path and
+modification time, so a file saved in between is read again.
+"""
+import os
+from openpyxl import load_workbook
+
+class ColumnCache:
+    """Header rows and column values of the active sheet of workbooks."""
+
+    def __init__(self):
+        # absolute path -> (modification time, size, headers, {column number: values})
+        self.files = {}
+
+    def get_entry(self, file_name):
+        """Get the cache entry of a file, reading its header row if it is new or changed."""
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry is None or entry[:2] != (stat.st_mtime, stat.st_size):
+            wb = load_workbook(path, read_only=True)
+            try:
+                headers = list(next(wb.active.iter_rows(max_row=1, values_only=True), ()))
+            finally:
+                wb.close()
+            entry = (stat.st_mtime, stat.st_size, headers, {})
+            self.files[path] = entry
+        return entry
+
+    def get_headers(self, file_name):
+        """Get the header row of the active sheet."""
+        return self.get_entry(file_name)[2]
+
+    def get_column(self, file_name, column_number):
+        """Get the values of a column below the header row (None for empty cells)."""
+        path = os.path.abspath(file_name)
+        columns = self.get_entry(file_name)[3]
+        if column_number not in columns:
+            wb = load_workbook(path, read_only=True)
+            try:
+                rows = wb.active.iter_rows(min_row=2, min_col=column_number, max_col=column_number, values_only=True)
+                columns[column_number] = [row[0] if row else None for row in rows]
+            finally:
+                wb.close()
+        return columns[column_number]
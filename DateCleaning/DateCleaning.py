@@ -1,6 +1,14 @@
 import os
+import sys
 import openpyxl
-import re
+import datetime
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CellCache import memoize_cleaner, print_cache_stats
+from JobSpec import parse_job
+from DateEngine import normalize_date
 
 def get_input_file(default_directory):
     """Prompt user to input the name of the Excel file."""
@@ -39,36 +47,13 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
-def format_date(date_string):
-    """Format date strings to 'XXXX年X月X日'."""
-    cleaned_string = ''.join(date_string.split())
-    
-    # Pattern 1: YYYY-MM-DD
-    match = re.match(r'(\d{4})-(\d{1,2})-(\d{1,2})', cleaned_string)
-    if match:
-        year = match.group(1)
-        month = str(int(match.group(2)))  # Convert to int to remove leading zeros
-        day = str(int(match.group(3)))    # Convert to int to remove leading zeros
-        return f"{year}年{month}月{day}日"
-    
-    # Pattern 2: YYYY年MM月DD日
-    match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', cleaned_string)
-    if match:
-        year = match.group(1)
-        month = str(int(match.group(2)))  # Convert to int to remove leading zeros
-        day = str(int(match.group(3)))    # Convert to int to remove leading zeros
-        return f"{year}年{month}月{day}日"
+@memoize_cleaner
+def format_date(value):
+    """Format date strings (or date cell values) to 'XXXX年X月X日'.
     
-    # Pattern 3: YYYYMMDD
-    match = re.match(r'(\d{4})(\d{2})(\d{2})', cleaned_string)
-    if match:
-        year = match.group(1)
-        month = str(int(match.group(2)))  # Convert to int to remove leading zeros
-        day = str(int(match.group(3)))    # Convert to int to remove leading zeros
-        return f"{year}年{month}月{day}日"
-    
-    # If date format does not match any pattern, return None
-    return None
+    Returns None if the value is not a date.
+    """
+    return normalize_date(value)
 
 def clean_dates(input_file, column_indices, output_file):
     """Clean and format dates in specified columns of an Excel file."""
@@ -81,9 +66,9 @@ def clean_dates(input_file, column_indices, output_file):
     for col in column_indices:
         for row in range(1, ws.max_row + 1):  # Start from row 1 (including header)
             cell = ws.cell(row=row, column=col)
-            if isinstance(cell.value, str):  # Check if the cell contains text
+            if isinstance(cell.value, (str, datetime.date)):  # Check if the cell contains text or a date
                 total_processed += 1
-                formatted_date = format_date(cell.value.strip())
+                formatted_date = format_date(cell.value)
                 if formatted_date:
                     if cell.value != formatted_date:  # Only count if the value actually changed
                         cell.value = formatted_date
@@ -94,13 +79,25 @@ def clean_dates(input_file, column_indices, output_file):
     print(f"Processing complete:")
     print(f"Total cells processed: {total_processed}")
     print(f"Changes made: {changes_made}")
+    print_cache_stats()
     print(f"Results saved to: {output_file}")
 
-# Main execution flow
-default_directory = os.getcwd()
+def main(argv=None):
+    """Main execution flow."""
+    # Run without prompts when a job spec or flags are given
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Standardize dates in the given columns to 'YYYY年X月X日'.")
+    if job is not None:
+        clean_dates(job['input'], job['columns'], job['output_file'])
+        return
+
+    default_directory = os.getcwd()
+
+    input_excel_file = get_input_file(default_directory)  # Pass default directory here
+    columns_to_clean = get_columns_to_clean()
+    output_excel_file = get_output_file_details(default_directory)
 
-input_excel_file = get_input_file(default_directory)  # Pass default directory here
-columns_to_clean = get_columns_to_clean()
-output_excel_file = get_output_file_details(default_directory)
+    clean_dates(input_excel_file, columns_to_clean, output_excel_file)
 
-clean_dates(input_excel_file, columns_to_clean, output_excel_file)
+if __name__ == "__main__":
+    main()
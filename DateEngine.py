@@ -0,0 +1,57 @@
+"""Shared date normalization engine for Main.py and DateCleaning.py.
+
+Dates are formatted as 'YYYY年M月D日'. Text dates are accepted as
+YYYY-M-D, YYYY年M月D日 or YYYYMMDD (spaces anywhere are ignored, and only
+the start of the text has to match), and native date/datetime cell values
+are converted directly.
+
+Text goes through a cheap dispatcher first: anything shorter than the
+shortest date, or whose fifth character cannot follow a year, is rejected
+without running a regex. The rest is parsed with one precompiled
+alternation that tries the three formats in the same order as before.
+"""
+import re
+import datetime
+
+# Year, then one of: -M-D | 年M月D日 | MMDD
+DATE_PATTERN = re.compile(r'(\d{4})(?:-(\d{1,2})-(\d{1,2})|年(\d{1,2})月(\d{1,2})日|(\d{2})(\d{2}))')
+
+# Shortest text that can match: 'YYYY-M-D' or 'YYYYMMDD'
+MIN_DATE_LENGTH = 8
+
+# Characters that can follow the year other than a digit
+DATE_SEPARATORS = ('-', '年')
+
+def format_date_parts(year, month, day):
+    """Format a year, month and day as 'YYYY年M月D日'."""
+    return f"{year}年{month}月{day}日"
+
+def normalize_date_text(text):
+    """Format date text as 'YYYY年M月D日', or return None if it is not a date."""
+    # Remove all whitespace
+    text = ''.join(text.split())
+    if len(text) < MIN_DATE_LENGTH:
+        return None
+
+    # Fast path: the fifth character must be a separator or a digit
+    separator = text[4]
+    if separator not in DATE_SEPARATORS and not separator.isdecimal():
+        return None
+
+    match = DATE_PATTERN.match(text)
+    if match is None:
+        return None
+    # The matched format's month and day are always the last two groups
+    last = match.lastindex
+    return format_date_parts(match.group(1), int(match.group(last - 1)), int(match.group(last)))
+
+def normalize_date(value):
+    """Format a cell value as 'YYYY年M月D日', or return None if it is not a date.
+
+    Accepts text dates and native date/datetime values.
+    """
+    if isinstance(value, str):
+        return normalize_date_text(value)
+    if isinstance(value, datetime.date):
+        return format_date_parts(value.year, value.month, value.day)
+    return None
@@ -0,0 +1,204 @@
+"""Non-interactive job specs for the cleaning tools.
+
+Every tool can be run without prompts by giving a JSON/YAML job file, CLI
+flags, or both (flags override the file). Without any arguments the tools
+keep asking for their settings interactively.
+
+Example job file for Main.py:
+
+    {
+        "input": "exports/store01.xlsx",
+        "column_types": {"1": 1, "2": 2, "3": 3, "4": 4},
+        "output_dir": "cleaned",
+        "output_name": "store01"
+    }
+
+column_types maps column numbers to the same choices as Main.py
+(1 Text, 2 Date, 3 Time, 4 Number, 5 None); columns left out are not
+cleaned. The standalone cleaners take "columns": [1, 2] instead.
+"""
+import os
+import json
+import argparse
+
+try:
+    import yaml
+except ImportError:
+    # PyYAML is optional; without it only JSON job files are accepted
+    yaml = None
+
+COLUMN_TYPE_CHOICES = ['1', '2', '3', '4', '5']
+
+def load_job_file(path):
+    """Load a job spec from a JSON or YAML file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ValueError("PyYAML is needed to read YAML job files. Please install it or use JSON.")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"Job file '{path}' must contain a mapping of settings.")
+    return spec
+
+# Settings that must be text when given
+TEXT_SETTINGS = ['input', 'output_dir', 'output_name', 'product_list']
+
+def check_text_settings(job, keys=TEXT_SETTINGS):
+    """Check that the given settings of a job are text, raising ValueError naming the first that is not."""
+    for key in keys:
+        if key in job and not isinstance(job[key], str):
+            raise ValueError(f"Job setting {key} must be text, not {type(job[key]).__name__}.")
+
+def parse_switch(value, key):
+    """Check that an on/off setting is true or false."""
+    if not isinstance(value, bool):
+        raise ValueError(f"Job setting {key} must be true or false, not {value!r}.")
+    return value
+
+def parse_worker_count(value, key='workers'):
+    """Parse a number of worker processes, checking it is at least 1."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Job setting {key} must be a whole number, not {value!r}.")
+    try:
+        count = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Job setting {key} must be a whole number, not {value!r}.") from None
+    if count < 1:
+        raise ValueError(f"Job setting {key} must be at least 1.")
+    return count
+
+def parse_fraction(value, key):
+    """Parse a number between 0 and 1, such as a similarity threshold."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"Job setting {key} must be a number between 0 and 1, not {value!r}.")
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Job setting {key} must be a number between 0 and 1, not {value!r}.") from None
+    if not 0 <= number <= 1:
+        raise ValueError(f"Job setting {key} must be between 0 and 1.")
+    return number
+
+def parse_column_number(value, key):
+    """Parse one column number of a setting, checking it is at least 1."""
+    try:
+        col = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Invalid column number '{value}' in {key}.") from None
+    if col < 1:
+        raise ValueError("Column index must be at least 1.")
+    return col
+
+def parse_columns(value):
+    """Parse column indices from '1,2' or a list, checking they are at least 1."""
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise ValueError("columns must be a list of column numbers or text such as '1,2'.")
+    return [parse_column_number(col, 'columns') for col in value]
+
+def parse_column_types(value):
+    """Parse column data types from '1:1,2:2' or a mapping into {column number: choice}."""
+    if isinstance(value, str):
+        pairs = [pair.split(':', 1) for pair in value.split(',')]
+        for pair in pairs:
+            if len(pair) != 2:
+                raise ValueError(f"Invalid column_types entry '{pair[0]}'. Please use column:type pairs such as 1:1,2:2.")
+        value = dict(pairs)
+    if not isinstance(value, dict):
+        raise ValueError("column_types must map column numbers to types, e.g. {\"1\": 1} or text such as '1:1,2:2'.")
+    column_types = {}
+    for col, choice in value.items():
+        col = parse_column_number(col, 'column_types')
+        choice = str(choice).strip()
+        if choice not in COLUMN_TYPE_CHOICES:
+            raise ValueError(f"Invalid data type '{choice}' for column {col}. Please use a number between 1 and 5.")
+        column_types[col] = choice
+    return column_types
+
+def expand_column_types(column_types, column_count):
+    """Expand {column number: choice} into one choice per column, using None (5) for the rest."""
+    return [column_types.get(col, '5') for col in range(1, column_count + 1)]
+
+def build_parser(description, column_types=False, streaming=False, product_list=False, add_arguments=None):
+    """Build the command line parser shared by the cleaning tools.
+
+    add_arguments(parser) can add tool-specific flags; their values are
+    kept in the job under the flag's name.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--job', help="JSON or YAML job spec file (flags override its settings)")
+    parser.add_argument('--input', help="input Excel file")
+    if column_types:
+        parser.add_argument('--column-types',
+                            help="column data types as column:type pairs, e.g. 1:1,2:2,3:3 "
+                                 "(1 Text, 2 Date, 3 Time, 4 Number, 5 None)")
+    else:
+        parser.add_argument('--columns', help="column indices to clean, e.g. 1,2 for columns A and B")
+    if product_list:
+        parser.add_argument('--product-list', help="product list file (.txt)")
+    if streaming:
+        parser.add_argument('--streaming', action='store_true', default=None,
+                            help="use the streaming mode for large files (cell formatting is not kept)")
+    parser.add_argument('--output-dir', help="output directory (default: current directory)")
+    parser.add_argument('--output-name', help="output file name (without extension)")
+    if add_arguments is not None:
+        add_arguments(parser)
+    return parser
+
+def parse_job(argv, description, column_types=False, streaming=False, product_list=False, add_arguments=None,
+              check_settings=None):
+    """Build a job from a spec file and/or command line flags.
+
+    Returns None when no arguments were given, so the caller can fall back to
+    the interactive prompts. Invalid settings exit with an error message;
+    check_settings(job) can check tool-specific settings by raising ValueError.
+    """
+    if not argv:
+        return None
+
+    parser = build_parser(description, column_types, streaming, product_list, add_arguments)
+    args = parser.parse_args(argv)
+
+    job = {}
+    if args.job:
+        try:
+            job = load_job_file(args.job)
+        except (OSError, ValueError) as e:
+            parser.error(f"Could not read job file: {e}")
+    for key, value in vars(args).items():
+        if key != 'job' and value is not None:
+            job[key] = value
+
+    required = ['input', 'output_name', 'column_types' if column_types else 'columns']
+    if product_list:
+        required.append('product_list')
+    missing = [key for key in required if not job.get(key)]
+    if missing:
+        parser.error("Missing job settings: " + ", ".join(missing))
+    try:
+        check_text_settings(job)
+    except ValueError as e:
+        parser.error(str(e))
+    if not os.path.isfile(job['input']):
+        parser.error(f"File '{job['input']}' not found.")
+    if product_list and not os.path.isfile(job['product_list']):
+        parser.error(f"File '{job['product_list']}' not found.")
+
+    try:
+        if column_types:
+            job['column_types'] = parse_column_types(job['column_types'])
+        else:
+            job['columns'] = parse_columns(job['columns'])
+        job['streaming'] = parse_switch(job.get('streaming', False), 'streaming')
+        if check_settings is not None:
+            check_settings(job)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_directory = job.get('output_dir') or os.getcwd()
+    os.makedirs(output_directory, exist_ok=True)
+    job['output_file'] = os.path.join(output_directory, f"{job['output_name']}.xlsx")
+    return job
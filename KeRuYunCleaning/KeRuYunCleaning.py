@@ -1,6 +1,11 @@
 import openpyxl
 import os
-from opencc import OpenCC
+import sys
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChineseConverter import ChineseConverter
 
 def delete_sheet(workbook, sheet_name):
     """Delete a specific sheet from the workbook."""
@@ -34,19 +39,20 @@ def delete_rows(workbook, sheet_name, start_row, end_row):
     else:
         print(f"Sheet '{sheet_name}' does not exist.")
 
-def translate_simplified_to_traditional(workbook, sheet_name):
+def translate_simplified_to_traditional(workbook, sheet_name, converter):
     """Translate all Simplified Chinese text to Traditional Chinese in the specified sheet."""
     if sheet_name in workbook.sheetnames:
-        cc = OpenCC('s2t')  # Initialize OpenCC for Simplified to Traditional conversion
         sheet = workbook[sheet_name]
-
-        for row in sheet.iter_rows():
-            for cell in row:
-                if isinstance(cell.value, str):  # Check if the cell value is a string
-                    original_text = cell.value
-                    translated_text = cc.convert(original_text)  # Convert text
-                    cell.value = translated_text  # Update cell value
-                    print(f"Translated '{original_text}' to '{translated_text}' in cell {cell.coordinate}.")
+        cells = [cell for row in sheet.iter_rows() for cell in row if isinstance(cell.value, str)]
+
+        # Convert each distinct text of the sheet once
+        translations = converter.convert_many(cell.value for cell in cells)
+        for cell in cells:
+            original_text = cell.value
+            translated_text, _ = translations[original_text]
+            cell.value = translated_text  # Update cell value
+            print(f"Translated '{original_text}' to '{translated_text}' in cell {cell.coordinate}.")
+        converter.save_cache()
     else:
         print(f"Sheet '{sheet_name}' does not exist.")
 
@@ -73,6 +79,7 @@ def main():
         input_file = input("Enter the name of the input Excel file (with .xlsx extension): ")
 
     workbook = openpyxl.load_workbook(input_file)
+    converter = ChineseConverter('s2t')  # Simplified to Traditional conversion
 
     while True:
         display_menu()
@@ -96,7 +103,7 @@ def main():
         elif choice == '3':
             # Translate Simplified Chinese to Traditional Chinese
             sheet_name = input("Enter the name of the sheet to translate: ")
-            translate_simplified_to_traditional(workbook, sheet_name)
+            translate_simplified_to_traditional(workbook, sheet_name, converter)
 
         elif choice == '4':
             # Save and exit
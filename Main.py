@@ -1,18 +1,20 @@
 import os
+import sys
 import openpyxl
 import re
-from opencc import OpenCC
+from ChineseConverter import ChineseConverter
+from CellCache import memoize_cleaner, print_cache_stats
+from JobSpec import parse_job, expand_column_types
+from DateEngine import normalize_date
 
 def get_input_file(default_directory):
     """Prompt user to input the name of the Excel file."""
     while True:
         input_file = input("Enter the name of the input Excel file (with .xlsx extension): ")
         full_path = os.path.join(default_directory, input_file)
-        try:
-            wb = openpyxl.load_workbook(full_path)
+        if os.path.isfile(full_path):
             return full_path
-        except FileNotFoundError:
-            print(f"File '{full_path}' not found. Please try again.")
+        print(f"File '{full_path}' not found. Please try again.")
 
 def get_output_file_details(default_directory):
     """Prompt user for output file name and directory."""
@@ -27,235 +29,338 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
+def get_worksheet_headers(ws):
+    """Get the headers (first row) of a worksheet."""
+    first_row = next(ws.iter_rows(max_row=1, values_only=True), ())
+    return [cell_value if cell_value is not None else "" for cell_value in first_row]
+
 def get_column_headers(file_path):
     """Get the headers (first row) of the Excel file."""
-    wb = openpyxl.load_workbook(file_path)
-    ws = wb.active
-    
-    max_col = ws.max_column
-    headers = []
-    
-    for col in range(1, max_col + 1):
-        cell_value = ws.cell(row=1, column=col).value
-        headers.append(cell_value if cell_value is not None else "")
-        
+    wb = openpyxl.load_workbook(file_path, read_only=True)
+    headers = get_worksheet_headers(wb.active)
     wb.close()
     return headers
 
-def convert_simplified_to_traditional(input_file, output_file):
-    """Convert Simplified Chinese text in an Excel file to Traditional Chinese."""
-    cc = OpenCC('s2t')
-    wb = openpyxl.load_workbook(input_file)
-    
-    special_changes = 0
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        for row in ws.iter_rows():
-            for cell in row:
-                if isinstance(cell.value, str):
-                    # 先進行一般的繁簡轉換
-                    converted_text = cc.convert(cell.value)
-                    
-                    # 特殊處理：將「餅幹」轉換為「餅乾」
-                    if '餅幹' in converted_text:
-                        original = converted_text
-                        converted_text = converted_text.replace('餅幹', '餅乾')
-                        if original != converted_text:
-                            special_changes += 1
-                    
-                    cell.value = converted_text
-    
-    wb.save(output_file)
+def print_conversion_summary(special_changes):
+    """Print the result of the Chinese conversion stage."""
     if special_changes > 0:
         print(f"Chinese conversion completed. Special conversion ('餅幹' -> '餅乾'): {special_changes} changes")
     else:
         print("Chinese conversion completed.")
-    return output_file
 
-def process_text_column(ws, col):
-    """Process text column - Remove spaces"""
-    changes = 0
-    for row in range(2, ws.max_row + 1):
-        cell = ws.cell(row=row, column=col)
-        if isinstance(cell.value, str):
-            cleaned_value = ''.join(cell.value.split())
-            if cell.value != cleaned_value:
-                cell.value = cleaned_value
-                changes += 1
-    return changes
+def convert_simplified_to_traditional(wb, converter):
+    """Convert Simplified Chinese text in a loaded workbook to Traditional Chinese in place."""
+    special_changes = 0
+    for ws in wb.worksheets:
+        # Each distinct string of the sheet is converted once
+        special_changes += converter.convert_worksheet(ws)
+    
+    print_conversion_summary(special_changes)
+    converter.print_stats()
+    return special_changes
 
-def process_date_column(ws, col):
-    """Process date column - Remove spaces and format date"""
-    changes = 0
-    for row in range(2, ws.max_row + 1):
-        cell = ws.cell(row=row, column=col)
-        if isinstance(cell.value, str):
-            # First remove spaces
-            cleaned_value = ''.join(cell.value.split())
-            
-            # Then format date
-            date_patterns = [
-                r'(\d{4})-(\d{1,2})-(\d{1,2})',
-                r'(\d{4})年(\d{1,2})月(\d{1,2})日',
-                r'(\d{4})(\d{2})(\d{2})'
-            ]
-            
-            formatted_date = None
-            for pattern in date_patterns:
-                match = re.match(pattern, cleaned_value)
-                if match:
-                    year = match.group(1)
-                    month = str(int(match.group(2)))
-                    day = str(int(match.group(3)))
-                    formatted_date = f"{year}年{month}月{day}日"
-                    break
-            
-            if formatted_date and cell.value != formatted_date:
-                cell.value = formatted_date
-                changes += 1
-    return changes
+@memoize_cleaner
+def clean_text_value(value):
+    """Remove all whitespace from a text value."""
+    if isinstance(value, str):
+        return ''.join(value.split())
+    return value
 
-def process_time_column(ws, col):
-    """Process time column - Format time or replace with N/A"""
-    changes = 0
-    for row in range(2, ws.max_row + 1):
-        cell = ws.cell(row=row, column=col)
-        original_value = cell.value
-        
-        # Initialize cleaned_value
-        cleaned_value = ""
+@memoize_cleaner
+def clean_date_value(value):
+    """Remove spaces from a date value and format it as 'YYYY年M月D日'."""
+    formatted_date = normalize_date(value)
+    return value if formatted_date is None else formatted_date
+
+@memoize_cleaner
+def clean_time_value(value):
+    """Format a time value as 'HH:MM' or replace it with N/A."""
+    # Initialize cleaned_value
+    cleaned_value = ""
+    
+    # Check if value is string
+    if isinstance(value, str):
+        # Try to match time patterns first
+        time_str = value.strip()
+        # Pattern for H:MM or HH:MM
+        match = re.match(r'^(\d{1,2}):(\d{2})$', time_str)
+        if match:
+            hours = int(match.group(1))
+            minutes = int(match.group(2))
+            if 0 <= hours <= 23 and 0 <= minutes <= 59:
+                return f"{hours:02d}:{minutes:02d}"
         
-        # Check if cell value is string
-        if isinstance(cell.value, str):
-            # Try to match time patterns first
-            time_str = cell.value.strip()
-            # Pattern for H:MM or HH:MM
-            match = re.match(r'^(\d{1,2}):(\d{2})$', time_str)
-            if match:
-                hours = int(match.group(1))
-                minutes = int(match.group(2))
-                if 0 <= hours <= 23 and 0 <= minutes <= 59:
-                    new_value = f"{hours:02d}:{minutes:02d}"
-                    if cell.value != new_value:
-                        cell.value = new_value
-                        changes += 1
-                    continue
-            
-            # If no match, try to extract numbers
-            cleaned_value = ''.join(filter(str.isdigit, time_str))
+        # If no match, try to extract numbers
+        cleaned_value = ''.join(filter(str.isdigit, time_str))
+    
+    # Format time if we have valid numeric data
+    new_value = "N/A"
+    if cleaned_value:
+        if len(cleaned_value) >= 4:
+            hours = int(cleaned_value[:2])
+            minutes = int(cleaned_value[2:4])
+            if 0 <= hours <= 23 and 0 <= minutes <= 59:
+                new_value = f"{hours:02d}:{minutes:02d}"
+        elif len(cleaned_value) == 3:
+            hours = int(cleaned_value[0])
+            minutes = int(cleaned_value[1:])
+            if 0 <= hours <= 23 and 0 <= minutes <= 59:
+                new_value = f"{hours:02d}:{minutes:02d}"
+    return new_value
+
+@memoize_cleaner
+def clean_number_value(value):
+    """Remove text and spaces from a number value and convert it to an integer."""
+    if isinstance(value, str):
+        # Keep only numeric characters
+        cleaned_value = ''.join(filter(str.isdigit, value))
+        new_value = int(cleaned_value) if cleaned_value else None
+        if value != str(new_value):
+            return new_value
+    return value
+
+def is_changed(old_value, new_value):
+    """Check whether a cleaner actually changed a value."""
+    return new_value is not old_value and new_value != old_value
+
+# Cleaners applied for each column type choice, in order, with the counter they add to
+COLUMN_CLEANERS = {
+    '1': [('text', clean_text_value)],
+    '2': [('date', clean_date_value)],
+    '3': [('time', clean_time_value)],
+    '4': [('number', clean_number_value), ('text', clean_text_value)],
+    '5': []
+}
+
+def get_column_choice(col_num, header):
+    """Prompt user to choose the data type of a column."""
+    while True:
+        print(f"\nFor column {col_num} ({header}), choose data type:")
+        print("1. Text")
+        print("2. Date")
+        print("3. Time")
+        print("4. Number")
+        print("5. None")
+        choice = input("Enter choice (1-5): ")
         
-        # Format time if we have valid numeric data
-        new_value = "N/A"
-        if cleaned_value:
-            if len(cleaned_value) >= 4:
-                hours = int(cleaned_value[:2])
-                minutes = int(cleaned_value[2:4])
-                if 0 <= hours <= 23 and 0 <= minutes <= 59:
-                    new_value = f"{hours:02d}:{minutes:02d}"
-            elif len(cleaned_value) == 3:
-                hours = int(cleaned_value[0])
-                minutes = int(cleaned_value[1:])
-                if 0 <= hours <= 23 and 0 <= minutes <= 59:
-                    new_value = f"{hours:02d}:{minutes:02d}"
+        if choice in ['1', '2', '3', '4', '5']:
+            return choice
+        print("Invalid choice. Please enter a number between 1 and 5.")
+
+def ask_streaming_mode():
+    """Ask user whether to use the streaming mode for large files."""
+    while True:
+        response = input("Use streaming mode for large files? Cell formatting will not be kept (Y/N): ").strip().upper()
+        if response in ['Y', 'N']:
+            return response == 'Y'
+        print("Please enter Y or N")
+
+def get_column_choices(headers):
+    """Print the column headers and collect a data type choice for every column."""
+    print("\nColumn headers:")
+    for i, header in enumerate(headers, 1):
+        print(f"{i}. {header}")
+    
+    return [get_column_choice(col_num, header) for col_num, header in enumerate(headers, 1)]
+
+def build_cleaning_plan(column_choices):
+    """Compile column type choices into a per-row plan of (0-based column index, cleaners)."""
+    return [(col_num - 1, COLUMN_CLEANERS[choice])
+            for col_num, choice in enumerate(column_choices, 1) if COLUMN_CLEANERS[choice]]
+
+def get_plan_width(plan):
+    """Get the number of columns a row must have for the plan to apply."""
+    return max((index + 1 for index, _ in plan), default=0)
+
+def new_change_counters():
+    """Create the per-type counters of modified cells."""
+    return {'text': 0, 'date': 0, 'time': 0, 'number': 0}
+
+def new_column_counters(plan):
+    """Create the modified cell counters of every cleaner in the plan, per planned column."""
+    return [[0] * len(cleaners) for _, cleaners in plan]
+
+def total_changes(plan, column_counts, column_changes=None):
+    """Add up per-column counters into the per-type change counters.
+    
+    If column_changes is a dict, it gets {0-based column index: [(counter, cells modified)]}.
+    """
+    changes = new_change_counters()
+    for (index, cleaners), counts in zip(plan, column_counts):
+        for (counter, _), count in zip(cleaners, counts):
+            changes[counter] += count
+        if column_changes is not None:
+            column_changes[index] = [(counter, count) for (counter, _), count in zip(cleaners, counts)]
+    return changes
+
+def clean_row_values(values, plan, column_counts):
+    """Apply a cleaning plan to a list of row values in place."""
+    for (index, cleaners), counts in zip(plan, column_counts):
+        for i, (counter, cleaner) in enumerate(cleaners):
+            new_value = cleaner(values[index])
+            if is_changed(values[index], new_value):
+                values[index] = new_value
+                counts[i] += 1
+
+def clean_worksheet(ws, plan, column_changes=None):
+    """Walk the data rows of a worksheet once, applying every column's cleaners to each row.
+    
+    Returns the per-type change counters; column_changes, if given, gets the
+    changes of every column (see total_changes()).
+    """
+    column_counts = new_column_counters(plan)
+    width = get_plan_width(plan)
+    if width == 0:
+        return total_changes(plan, column_counts, column_changes)
+    
+    for row in ws.iter_rows(min_row=2, max_col=width):
+        for (index, cleaners), counts in zip(plan, column_counts):
+            cell = row[index]
+            for i, (counter, cleaner) in enumerate(cleaners):
+                new_value = cleaner(cell.value)
+                if is_changed(cell.value, new_value):
+                    cell.value = new_value
+                    counts[i] += 1
+    return total_changes(plan, column_counts, column_changes)
+
+def stream_clean_workbook(input_file, output_file, column_choices, converter, column_changes=None):
+    """Convert and clean a workbook row by row with flat memory usage.
+    
+    The source is read through a read-only workbook and every row is written
+    to a write-only workbook as soon as it is cleaned, so only one row is held
+    in memory at a time. Cell formatting is not carried over.
+    """
+    plan = build_cleaning_plan(column_choices)
+    width = get_plan_width(plan)
+    column_counts = new_column_counters(plan)
+    special_changes = 0
+    
+    src_wb = openpyxl.load_workbook(input_file, read_only=True)
+    out_wb = openpyxl.Workbook(write_only=True)
+    active_title = src_wb.active.title
+    
+    for ws in src_wb.worksheets:
+        out_ws = out_wb.create_sheet(ws.title)
+        is_active = ws.title == active_title
         
-        if original_value != new_value:
-            cell.value = new_value
-            changes += 1
+        for row_num, row in enumerate(ws.iter_rows(values_only=True), 1):
+            values = list(row)
+            for i, value in enumerate(values):
+                if isinstance(value, str):
+                    values[i], special = converter.convert(value)
+                    special_changes += special
             
-    return changes
+            if is_active and row_num > 1:
+                # Pad short rows so empty trailing cells are cleaned as well
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                clean_row_values(values, plan, column_counts)
+            
+            out_ws.append(values)
+    
+    src_wb.close()
+    out_wb.save(output_file)
+    print_conversion_summary(special_changes)
+    converter.print_stats()
+    return total_changes(plan, column_counts, column_changes)
+
+def print_column_changes(headers, column_changes):
+    """Print the number of modified cells of every cleaned column."""
+    for index, counts in column_changes.items():
+        header = headers[index] if index < len(headers) else ""
+        print(f"\nColumn {index + 1} ({header}):")
+        for position, (counter, count) in enumerate(counts):
+            # A number column's text cleaning comes after its number cleaning
+            label = f"{counter.capitalize()} cleaning" if position == 0 else f"Additional {counter} cleaning"
+            print(f"{label}: {count} cells modified")
 
-def process_number_column(ws, col):
-    """Process number column - Remove text and spaces"""
-    changes = 0
-    for row in range(2, ws.max_row + 1):
-        cell = ws.cell(row=row, column=col)
-        if isinstance(cell.value, str):
-            # Keep only numeric characters
-            cleaned_value = ''.join(filter(str.isdigit, cell.value))
-            new_value = int(cleaned_value) if cleaned_value else None
-            if cell.value != str(new_value):
-                cell.value = new_value
-                changes += 1
+def print_total_changes(changes):
+    """Print the total number of modified cells per cleaning type."""
+    print("\nTotal changes made:")
+    print(f"Text cleaning: {changes['text']} cells modified")
+    print(f"Date cleaning: {changes['date']} cells modified")
+    print(f"Time cleaning: {changes['time']} cells modified")
+    print(f"Number cleaning: {changes['number']} cells modified")
+    print(f"Total modifications: {sum(changes.values())} cells")
+    print_cache_stats()
+
+def clean_file(input_file, output_file, column_types, streaming=False, converter=None, save_cache=True):
+    """Run the whole cleaning pipeline on one file without any prompts.
+    
+    column_types maps column numbers to data type choices (1-5); other
+    columns are not cleaned. With save_cache=False the conversion cache is
+    left for the caller to save. Returns the per-type change counters.
+    """
+    if converter is None:
+        converter = ChineseConverter()
+    
+    column_changes = {}
+    if streaming:
+        headers = get_column_headers(input_file)
+        column_choices = expand_column_types(column_types, len(headers))
+        changes = stream_clean_workbook(input_file, output_file, column_choices, converter, column_changes)
+    else:
+        wb = openpyxl.load_workbook(input_file)
+        ws = wb.active
+        convert_simplified_to_traditional(wb, converter)
+        headers = get_worksheet_headers(ws)
+        column_choices = expand_column_types(column_types, len(headers))
+        changes = clean_worksheet(ws, build_cleaning_plan(column_choices), column_changes)
+        wb.save(output_file)
+    print_column_changes(headers, column_changes)
+    
+    if save_cache:
+        converter.save_cache()
     return changes
 
-def main():
-    default_directory = os.getcwd()
+def main(argv=None):
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Convert Chinese text and clean each column of an Excel file by data type.",
+                    column_types=True, streaming=True)
+    if job is not None:
+        changes = clean_file(job['input'], job['output_file'], job['column_types'], job['streaming'])
+        print_total_changes(changes)
+        print(f"\nProcessing complete. Final output saved to: {job['output_file']}")
+        return
     
-    # Initialize counters for each type of cleaning
-    total_text_changes = 0
-    total_date_changes = 0
-    total_time_changes = 0
-    total_number_changes = 0
+    default_directory = os.getcwd()
     
     # Step 1: Get input file and convert Chinese characters
     input_file = get_input_file(default_directory)
-    temp_output = os.path.join(default_directory, "temp_converted.xlsx")
-    converted_file = convert_simplified_to_traditional(input_file, temp_output)
+    converter = ChineseConverter()
     
-    # Step 2: Get column headers and process based on type
-    headers = get_column_headers(converted_file)
-    print("\nColumn headers:")
-    for i, header in enumerate(headers, 1):
-        print(f"{i}. {header}")
+    if ask_streaming_mode():
+        headers = get_column_headers(input_file)
+        column_choices = get_column_choices(headers)
+        final_output = get_output_file_details(default_directory)
+        column_changes = {}
+        changes = stream_clean_workbook(input_file, final_output, column_choices, converter, column_changes)
+        converter.save_cache()
+        print_column_changes(headers, column_changes)
+        print_total_changes(changes)
+        print(f"\nProcessing complete. Final output saved to: {final_output}")
+        return
     
-    # Create new workbook for final output
-    wb = openpyxl.load_workbook(converted_file)
+    # Parse the workbook once; conversion and cleaning both work on it in memory
+    wb = openpyxl.load_workbook(input_file)
     ws = wb.active
+    convert_simplified_to_traditional(wb, converter)
+    converter.save_cache()
     
-    # Process each column
-    for col_num in range(1, len(headers) + 1):
-        while True:
-            print(f"\nFor column {col_num} ({headers[col_num-1]}), choose data type:")
-            print("1. Text")
-            print("2. Date")
-            print("3. Time")
-            print("4. Number")
-            print("5. None")
-            choice = input("Enter choice (1-5): ")
-            
-            if choice in ['1', '2', '3', '4', '5']:
-                if choice == '1':  # Text
-                    changes = process_text_column(ws, col_num)
-                    print(f"Text cleaning: {changes} cells modified")
-                    total_text_changes += changes
-                elif choice == '2':  # Date
-                    changes = process_date_column(ws, col_num)
-                    print(f"Date cleaning: {changes} cells modified")
-                    total_date_changes += changes
-                elif choice == '3':  # Time
-                    changes = process_time_column(ws, col_num)
-                    print(f"Time cleaning: {changes} cells modified")
-                    total_time_changes += changes
-                elif choice == '4':  # Number
-                    changes1 = process_number_column(ws, col_num)
-                    changes2 = process_text_column(ws, col_num)
-                    print(f"Number cleaning: {changes1} cells modified")
-                    print(f"Additional text cleaning: {changes2} cells modified")
-                    total_number_changes += changes1
-                    total_text_changes += changes2
-                # Choice 5 (None) does nothing
-                break
-            else:
-                print("Invalid choice. Please enter a number between 1 and 5.")
+    # Step 2: Collect every column's type, then clean all columns in a single pass
+    headers = get_worksheet_headers(ws)
+    column_choices = get_column_choices(headers)
+    column_changes = {}
+    changes = clean_worksheet(ws, build_cleaning_plan(column_choices), column_changes)
+    print_column_changes(headers, column_changes)
     
     # Print total changes before saving
-    print("\nTotal changes made:")
-    print(f"Text cleaning: {total_text_changes} cells modified")
-    print(f"Date cleaning: {total_date_changes} cells modified")
-    print(f"Time cleaning: {total_time_changes} cells modified")
-    print(f"Number cleaning: {total_number_changes} cells modified")
-    print(f"Total modifications: {total_text_changes + total_date_changes + total_time_changes + total_number_changes} cells")
+    print_total_changes(changes)
     
     # Save final output
     final_output = get_output_file_details(default_directory)
     wb.save(final_output)
     
-    # Clean up temporary file
-    try:
-        os.remove(temp_output)
-    except:
-        pass
-    
     print(f"\nProcessing complete. Final output saved to: {final_output}")
 
 if __name__ == "__main__":
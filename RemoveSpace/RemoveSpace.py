@@ -1,6 +1,12 @@
 import os
+import sys
 import openpyxl
 
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from JobSpec import parse_job
+
 def get_input_file(default_directory):
     """Prompt user to input the name of the Excel file."""
     while True:
@@ -54,16 +60,27 @@ def remove_spaces_from_cells(input_file, column_indices, output_file):
     wb.save(output_file)
     print(f"All unnecessary spaces have been removed and saved to {output_file}")
 
-# Main execution flow
-# Get default directory where the script is running
-default_directory = os.getcwd()
+def main(argv=None):
+    """Main execution flow."""
+    # Run without prompts when a job spec or flags are given
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Remove spaces from the cells of the given columns.")
+    if job is not None:
+        remove_spaces_from_cells(job['input'], job['columns'], job['output_file'])
+        return
+
+    # Get default directory where the script is running
+    default_directory = os.getcwd()
+
+    # Get user input for file name and columns to clean
+    input_excel_file = get_input_file(default_directory)  # Pass default directory here
+    columns_to_clean = get_columns_to_clean()
 
-# Get user input for file name and columns to clean
-input_excel_file = get_input_file(default_directory)  # Pass default directory here
-columns_to_clean = get_columns_to_clean()
+    # Get output file details from user
+    output_excel_file = get_output_file_details(default_directory)
 
-# Get output file details from user
-output_excel_file = get_output_file_details(default_directory)
+    # Remove spaces from specified columns and save to output file
+    remove_spaces_from_cells(input_excel_file, columns_to_clean, output_excel_file)
 
-# Remove spaces from specified columns and save to output file
-remove_spaces_from_cells(input_excel_file, columns_to_clean, output_excel_file)
+if __name__ == "__main__":
+    main()
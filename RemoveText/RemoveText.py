@@ -1,5 +1,11 @@
 import openpyxl
 import os
+import sys
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from JobSpec import parse_job
 
 def clean_numeric_columns(input_file, output_file, columns_to_clean):
     """Clean numeric data in specified columns of an Excel file."""
@@ -57,11 +63,22 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
-# Main execution flow
-input_excel_file = get_input_file()
-columns_to_clean = get_columns_to_clean()
+def main(argv=None):
+    """Main execution flow."""
+    # Run without prompts when a job spec or flags are given
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Remove non-numeric characters from the given columns and convert them to integers.")
+    if job is not None:
+        clean_numeric_columns(job['input'], job['output_file'], job['columns'])
+        return
+
+    input_excel_file = get_input_file()
+    columns_to_clean = get_columns_to_clean()
+
+    default_directory = os.getcwd()
+    output_excel_file = get_output_file_details(default_directory)
 
-default_directory = os.getcwd()
-output_excel_file = get_output_file_details(default_directory)
+    clean_numeric_columns(input_excel_file, output_excel_file, columns_to_clean)
 
-clean_numeric_columns(input_excel_file, output_excel_file, columns_to_clean)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""SQLite cache of the AI model's answers for SmartTag.py.
+
+Answers live in response_cache.db, keyed by the normalized product name,
+the model and the prompt version, so a changed model or prompt asks again
+while spelling variants of a name share one answer. Each answer is stored
+as the model gave it, with the time it was received and how long it stays
+valid; expired answers are ignored and removed when the cache is opened.
+Only answers with a valid category are stored, never error fallbacks.
+"""
+import time
+import unicodedata
+from SQLiteStore import connect, lookup_keys
+
+DEFAULT_DB_FILE = "response_cache.db"
+
+# Seconds a cached answer stays valid (90 days)
+DEFAULT_TTL = 90 * 24 * 60 * 60
+
+def normalize_name(name):
+    """Normalize a product name for the cache key: NFKC, collapsed whitespace and case folded."""
+    return ' '.join(unicodedata.normalize('NFKC', str(name)).split()).casefold()
+
+class ResponseCache:
+    """(normalized name, model, prompt version) -> raw answer mapping backed by SQLite."""
+
+    def __init__(self, db_file=DEFAULT_DB_FILE, ttl=DEFAULT_TTL):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.conn = connect(db_file)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (name TEXT NOT NULL, model TEXT NOT NULL, "
+            "prompt_version TEXT NOT NULL, answer TEXT NOT NULL, created REAL NOT NULL, ttl REAL NOT NULL, "
+            "PRIMARY KEY (name, model, prompt_version))")
+        self.conn.commit()
+        self.purge_expired()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def purge_expired(self):
+        """Remove the expired answers, returning how many."""
+        with self.conn:
+            return self.conn.execute("DELETE FROM responses WHERE created + ttl < ?", (time.time(),)).rowcount
+
+    def lookup(self, names, model, prompt_version):
+        """Get {name: answer} for the names with an unexpired answer, keyed by the names as given."""
+        return lookup_keys(self.conn,
+                           "SELECT name, answer FROM responses WHERE model = ? AND prompt_version = ? "
+                           "AND name IN ({placeholders}) AND created + ttl >= ?",
+                           names, key=normalize_name, params=(model, prompt_version), trailing_params=(time.time(),))
+
+    def set_many(self, pairs, model, prompt_version):
+        """Store the answers of (name, answer) pairs in one transaction, returning how many."""
+        now = time.time()
+        rows = [(normalize_name(name), model, prompt_version, answer, now, self.ttl) for name, answer in pairs]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO responses (name, model, prompt_version, answer, created, ttl) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name, model, prompt_version) DO UPDATE SET "
+                "answer = excluded.answer, created = excluded.created, ttl = excluded.ttl",
+                rows)
+        return len(rows)
+
+    def clear(self):
+        """Remove every cached answer."""
+        with self.conn:
+            self.conn.execute("DELETE FROM responses")
@@ -0,0 +1,39 @@
+"""Connection setup and batched lookups shared by the SQLite stores.
+
+ClassificationStore and ResponseCache are both opened by several processes
+at once and look up many keys at a time; this module keeps how they connect
+and how they query a list of keys in one place.
+"""
+import sqlite3
+
+# Maximum number of parameters in one SQLite statement
+SQL_BATCH = 500
+
+def connect(db_file):
+    """Open a SQLite database in WAL mode, so several processes can read and write it at the same time."""
+    # Wait for other processes' transactions instead of failing at once
+    conn = sqlite3.connect(db_file, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def lookup_keys(conn, query, items, key=str, params=(), trailing_params=()):
+    """Get {item: value} for the items whose key is found by query, keyed by the items as given.
+
+    query selects (key, value) rows and has a {placeholders} field for the
+    IN list of keys, which is filled SQL_BATCH keys at a time between params
+    and trailing_params. Items sharing a key share its value.
+    """
+    keys = {}
+    for item in items:
+        keys.setdefault(key(item), []).append(item)
+    found = {}
+    texts = list(keys)
+    for start in range(0, len(texts), SQL_BATCH):
+        batch = texts[start:start + SQL_BATCH]
+        placeholders = ','.join('?' * len(batch))
+        for text, value in conn.execute(query.format(placeholders=placeholders),
+                                        [*params, *batch, *trailing_params]):
+            for item in keys[text]:
+                found[item] = value
+    return found
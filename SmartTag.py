@@ -1,60 +1,162 @@
 from openpyxl import load_workbook
-from collections import Counter
 import os
+import json
+import asyncio
 import logging
-from groq import Groq
+from collections import Counter
+from groq import AsyncGroq
+from ClassificationStore import ClassificationStore
+from ResponseCache import ResponseCache, normalize_name
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
+# Do not log every API request and rate limit retry of a concurrent run
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("groq").setLevel(logging.WARNING)
 
 # Load the API key from environment variables
 api_key = os.getenv("GROQ_API_KEY")
 if api_key is None:
     raise ValueError("API key not found. Please set the GROQ_API_KEY environment variable.")
 
-# Initialize the Groq client with the API key
-client = Groq(api_key=api_key)
+# The API address can be changed with the GROQ_BASE_URL environment variable (e.g. a local stub server for testing)
+MODEL = "llama-3.3-70b-versatile"  # Ensure this is a valid model name
+
+# Requests sent to the API at the same time unless another number is entered
+DEFAULT_CONCURRENCY = 8
+
+# Retries of a request that hit the rate limit (the client waits as the API asks)
+MAX_RETRIES = 8
+
+VALID_CATEGORIES = ['food', 'beverage', 'other']
+
+# Versions of the two prompts in the response cache keys; change them when a prompt changes
+PROMPT_VERSION = "single-1"
+BATCH_PROMPT_VERSION = "batch-1"
+
+# Products per request in the batched mode unless another number is entered
+DEFAULT_BATCH_SIZE = 50
+
+# Token budgets of one batched request; batches are cut early when long names would exceed them
+MAX_PROMPT_TOKENS = 6000
+MAX_COMPLETION_TOKENS = 4000
+
+# Answer tokens per product besides its name: quotes, colon, category and comma
+TOKENS_PER_ANSWER = 8
+
+# Rounds of batched requests; later rounds re-query only the products missing or invalid in the answers
+MAX_ROUNDS = 3
+
+BATCH_PROMPT = ("Classify each of the following products as food, beverage, or other. "
+                "Respond with only a JSON object that maps every product name, exactly as given, "
+                "to 'food', 'beverage', or 'other'.\nProducts: ")
 
 def save_classifications(classifications, filename="classifications.txt"):
-    """Save classifications to a text file with UTF-8 encoding."""
+    """Export classifications to a text file with UTF-8 encoding."""
     with open(filename, 'w', encoding='utf-8') as file:
         for item, category in classifications.items():
             file.write(f"{item}:{category}\n")
-    print("Classifications saved to", filename)
-
-def load_classifications(filename="classifications.txt"):
-    """Load classifications from a text file."""
-    if not os.path.exists(filename):
-        return {}
-    
-    classifications = {}
-    with open(filename, 'r', encoding='utf-8') as file:
-        for line in file:
-            stripped_line = line.strip()
-            if stripped_line:  # Only process non-empty lines
-                parts = stripped_line.split(':')
-                if len(parts) == 2:  # Ensure there are exactly two parts
-                    item, category = parts
-                    classifications[item] = category
-                else:
-                    print(f"Warning: Skipping malformed line: '{stripped_line}'")
-    print("Classifications loaded from", filename)
-    return classifications
+    print("Classifications exported to", filename)
+
+def get_batch_size():
+    """Prompt user for the number of products sent in one request."""
+    while True:
+        batch_input = input(f"Enter the number of products per request (or press Enter for {DEFAULT_BATCH_SIZE}, '1' to send them one by one): ").strip()
+        if not batch_input:
+            return DEFAULT_BATCH_SIZE
+        try:
+            batch_size = int(batch_input)
+            if batch_size >= 1:
+                return batch_size
+        except ValueError:
+            pass
+        print("Please enter a whole number of at least 1.")
+
+def estimate_tokens(text):
+    """Roughly count the tokens of a text: about four ASCII characters, or one other character, per token."""
+    ascii_chars = sum(ch.isascii() for ch in text)
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+def make_batches(names, batch_size):
+    """Split names into batches of at most batch_size that fit the prompt and answer token budgets."""
+    batches = []
+    batch = []
+    prompt_tokens = answer_tokens = 0
+    base_tokens = estimate_tokens(BATCH_PROMPT)
+    for name in names:
+        tokens = estimate_tokens(name)
+        if batch and (len(batch) >= batch_size
+                      or base_tokens + prompt_tokens + tokens + 2 > MAX_PROMPT_TOKENS
+                      # Half the answer budget, as the request allows twice the estimate
+                      or 2 * (answer_tokens + tokens + TOKENS_PER_ANSWER) > MAX_COMPLETION_TOKENS):
+            batches.append(batch)
+            batch = []
+            prompt_tokens = answer_tokens = 0
+        batch.append(name)
+        prompt_tokens += tokens + 2
+        answer_tokens += tokens + TOKENS_PER_ANSWER
+    if batch:
+        batches.append(batch)
+    return batches
+
+def parse_batch_answer(content, names):
+    """Get {name: answer} for the names with a valid category in a JSON answer (None if it is not JSON)."""
+    start, end = content.find('{'), content.rfind('}')
+    try:
+        answer = json.loads(content[start:end + 1]) if start != -1 else None
+    except ValueError:
+        answer = None
+    if not isinstance(answer, dict):
+        return None
+    answer = {str(key).strip(): value for key, value in answer.items()}
+    categories = {}
+    for name in names:
+        category = answer.get(name.strip())
+        if isinstance(category, str) and is_valid_answer(category):
+            categories[name] = category.strip()
+    return categories
+
+def is_valid_answer(answer):
+    """Check that a model answer is one of the valid categories."""
+    return answer is not None and answer.strip().lower() in VALID_CATEGORIES
+
+def count_usage(stats, response):
+    """Add a response's request and token counts to the run statistics."""
+    stats['requests'] += 1
+    usage = getattr(response, 'usage', None)
+    if usage is not None and usage.total_tokens:
+        stats['tokens'] += usage.total_tokens
 
-def get_ai_response(product_name):
-    """Function to get a response from the AI model based on product name."""
-    model = "llama-3.3-70b-versatile"  # Ensure this is a valid model name
+def get_concurrency():
+    """Prompt user for the number of requests sent to the API at the same time."""
+    while True:
+        concurrency_input = input(f"Enter the number of requests to send at the same time (or press Enter for {DEFAULT_CONCURRENCY}): ").strip()
+        if not concurrency_input:
+            return DEFAULT_CONCURRENCY
+        try:
+            concurrency = int(concurrency_input)
+            if concurrency >= 1:
+                return concurrency
+        except ValueError:
+            pass
+        print("Please enter a whole number of at least 1.")
+
+async def get_ai_response(client, product_name, semaphore, stats):
+    """Function to get a response from the AI model based on product name (None if the request failed)."""
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
         {"role": "user", "content": f"Please classify '{product_name}' as food, beverage, or other. Only respond with 'food', 'beverage', or 'other'."}
     ]
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_tokens=10  # Limit tokens to avoid excessive output
-        )
+        # Wait for a free slot so at most `concurrency` requests are in flight
+        async with semaphore:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                max_tokens=10  # Limit tokens to avoid excessive output
+            )
+        count_usage(stats, response)
 
         # Log response for debugging (optional)
         logging.debug("API Response: %s", response)
@@ -63,19 +165,128 @@ def get_ai_response(product_name):
         if hasattr(response, 'choices') and len(response.choices) > 0:
             choice = response.choices[0]
             if hasattr(choice, 'message'):
-                return choice.message.content.strip().lower()  # Return content in lowercase
+                return (choice.message.content or '').strip()  # Return the answer as given
             else:
-                return "Invalid response."
+                return None
         else:
-            return "No choices in response."
+            return None
+
+    except Exception as e:
+        logging.error("Error while calling Groq API: %s", e)
+        return None  # No answer on error, so nothing is stored or cached
+
+async def get_batch_response(client, names, semaphore, stats):
+    """Classify a batch of product names in one request.
 
+    Returns ({name: answer} for the valid answers, status), where status is
+    'ok', 'truncated' (the answer was cut off or is not JSON) or 'error'.
+    """
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": BATCH_PROMPT + json.dumps(names, ensure_ascii=False)}
+    ]
+    answer_tokens = sum(estimate_tokens(name) + TOKENS_PER_ANSWER for name in names) + 2
+    try:
+        async with semaphore:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                # Leave room for the model's tokens being longer than estimated
+                max_tokens=min(MAX_COMPLETION_TOKENS, answer_tokens * 2 + 16),
+                response_format={"type": "json_object"}
+            )
+        count_usage(stats, response)
+        logging.debug("API Response: %s", response)
     except Exception as e:
         logging.error("Error while calling Groq API: %s", e)
-        return 'other'  # Default to 'other' on error
+        return {}, 'error'
+
+    if not getattr(response, 'choices', None):
+        return {}, 'error'
+    choice = response.choices[0]
+    categories = parse_batch_answer(choice.message.content or '', names)
+    if categories is None or choice.finish_reason == 'length':
+        return categories or {}, 'truncated'
+    return categories, 'ok'
+
+async def get_batched_responses(names, concurrency, batch_size, stats):
+    """Classify names in batched requests, re-querying the missing or invalid ones.
+
+    The batch size is halved after a round in which an answer was cut off.
+    Returns {name: answer} for the names that got a valid answer.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    categories = {}
+    pending = list(names)
+    async with AsyncGroq(api_key=api_key, max_retries=MAX_RETRIES) as client:
+        for _ in range(MAX_ROUNDS):
+            if not pending:
+                break
+            batches = make_batches(pending, batch_size)
+            outcomes = await asyncio.gather(*(get_batch_response(client, batch, semaphore, stats) for batch in batches))
+            pending = []
+            for batch, (answers, status) in zip(batches, outcomes):
+                categories.update(answers)
+                pending.extend(name for name in batch if name not in answers)
+                if status == 'truncated':
+                    batch_size = max(1, len(batch) // 2)
+    return categories
+
+async def get_ai_responses(items, concurrency, stats):
+    """Classify items with up to `concurrency` requests in flight, returning the responses in item order."""
+    semaphore = asyncio.Semaphore(concurrency)
+    # One client per run, as its connections belong to the run's event loop
+    async with AsyncGroq(api_key=api_key, max_retries=MAX_RETRIES) as client:
+        return await asyncio.gather(*(get_ai_response(client, item, semaphore, stats) for item in items))
+
+def classify_items(items, concurrency=DEFAULT_CONCURRENCY, batch_size=1, stats=None, cache=None):
+    """Classify items with the AI model, returning {item: category} for the valid responses.
+
+    With batch_size above 1, that many products are sent in each request and
+    asked for as one JSON answer. The API requests and tokens used are added
+    to stats (a Counter) when it is given.
+
+    With a ResponseCache, items with a cached answer for this model and prompt
+    are not sent, new valid answers are cached, and the cache hits and misses
+    are added to stats.
+    """
+    items = list(items)
+    stats = Counter() if stats is None else stats
+    prompt_version = BATCH_PROMPT_VERSION if batch_size > 1 else PROMPT_VERSION
+    answers = cache.lookup(items, MODEL, prompt_version) if cache is not None else {}
+
+    # Ask once for the items sharing a normalized name
+    missing = {}
+    for item in items:
+        if item not in answers:
+            missing.setdefault(normalize_name(item), []).append(item)
+    if cache is not None:
+        stats['cache_hits'] += len(answers)
+        stats['cache_misses'] += len(items) - len(answers)
+
+    if missing:
+        queried = [group[0] for group in missing.values()]
+        if batch_size > 1:
+            names = {str(item): item for item in queried}
+            responses = asyncio.run(get_batched_responses(list(names), concurrency, batch_size, stats))
+            new_answers = {names[name]: answer for name, answer in responses.items()}
+        else:
+            responses = asyncio.run(get_ai_responses(queried, concurrency, stats))
+            new_answers = {item: response for item, response in zip(queried, responses) if is_valid_answer(response)}
+        if cache is not None:
+            cache.set_many(new_answers.items(), MODEL, prompt_version)
+        for group in missing.values():
+            if group[0] in new_answers:
+                for item in group:
+                    answers[item] = new_answers[group[0]]
+
+    # Validate and ensure only allowed responses are stored
+    return {item: answers[item].strip().capitalize() for item in items if is_valid_answer(answers.get(item))}
 
 def classify_products():
     """Classify products as Food, Drink, or Others based on user input from an Excel file."""
-    classifications = load_classifications()  # Load existing classifications
+    classifications = ClassificationStore()  # Existing classifications, saved as they change
+    response_cache = ResponseCache()  # Model answers kept across runs, so only new products are sent
 
     while True:
         print("\nSelect an option:")
@@ -109,22 +320,29 @@ def classify_products():
                         if item is not None:
                             items.add(item)
                     
-                    # Limit to first 20 unique items and classify them
-                    classified_count = 0
-                    
+                    # Classify every unique item that is not classified yet
+                    known = classifications.lookup(items)
+                    new_items = []
                     for item in items:
-                        if classified_count >= 20:   # Stop after classifying 20 products
-                            break
-                        if item in classifications:
-                            print(f"'{item}' is already classified as {classifications[item]}. Skipping.")
+                        if item in known:
+                            print(f"'{item}' is already classified as {known[item]}. Skipping.")
                         else:
-                            category_result = get_ai_response(item)  # Call AI function to classify using Groq API
-
-                            # Validate and ensure only allowed responses are stored
-                            valid_categories = ['food', 'beverage', 'other']
-                            if category_result in valid_categories:
-                                classifications[item] = category_result.capitalize()  # Store classification
-                                classified_count += 1   # Increment count of classified products
+                            new_items.append(item)
+                    
+                    classified_count = 0
+                    if new_items:
+                        concurrency = get_concurrency()
+                        batch_size = get_batch_size()
+                        print(f"Classifying {len(new_items)} products with up to {concurrency} requests at a time...")
+                        stats = Counter()
+                        results = classify_items(new_items, concurrency, batch_size, stats, response_cache)  # Call AI function to classify using Groq API
+                        print(f"{stats['requests']} API requests, {stats['tokens']} tokens "
+                              f"({stats['requests'] / len(new_items):.2f} requests and {stats['tokens'] / len(new_items):.1f} tokens per product)")
+                        print(f"Response cache: {stats['cache_hits']} of {len(new_items)} products answered from the cache "
+                              f"({stats['cache_hits'] / len(new_items):.0%} hit rate)")
+                        classified_count = classifications.set_many(results.items())  # Store classifications
+                        if len(results) < len(new_items):
+                            print(f"{len(new_items) - len(results)} products got no valid answer and were not classified.")
                     
                     print(f"Classified {classified_count} new products.")
                 else:
@@ -136,7 +354,7 @@ def classify_products():
 
         elif choice == '1':
             # View classifications
-            if not classifications:
+            if not len(classifications):
                 print("No classifications available. Please classify products first.")
                 continue
             
@@ -154,10 +372,11 @@ def classify_products():
                 column_number = int(input("Enter the column number (starting from 1): "))
                 
                 if 1 <= column_number <= sheet.max_column:
-                    for row in range(2, sheet.max_row + 1):  # Start from row 2 to skip header
-                        item = sheet.cell(row=row, column=column_number).value
+                    column = [sheet.cell(row=row, column=column_number).value for row in range(2, sheet.max_row + 1)]
+                    found = classifications.lookup(item for item in column if item is not None)
+                    for item in column:  # Rows from 2, skipping the header
                         if item is not None:
-                            category = classifications.get(item, "Unclassified")
+                            category = found.get(item, "Unclassified")
                             print(f"{item} is classified as {category}.")
                 else:
                     print("Invalid column number.")
@@ -177,16 +396,11 @@ def classify_products():
                 column_number = int(input("Enter the column number (starting from 1): "))
                 
                 if 1 <= column_number <= sheet.max_column:
-                    counts = Counter()
-                    for row in range(2, sheet.max_row + 1):  # Start from row 2 to skip header
-                        item = sheet.cell(row=row, column=column_number).value
-                        if item is not None:
-                            category = classifications.get(item)
-                            if category: 
-                                counts[category] += 1
+                    column = [sheet.cell(row=row, column=column_number).value for row in range(2, sheet.max_row + 1)]
+                    counts = classifications.count_categories(item for item in column if item is not None)
                     
                     print("\nClassification Counts:")
-                    for category, count in counts.items():
+                    for category, count in counts:
                         print(f"{category}: {count}")
                 else:
                     print("Invalid column number.")
@@ -222,15 +436,14 @@ def classify_products():
                 print("Invalid action. Please enter 'a' to add or 'd' to delete.")
 
         elif choice == '5':
-            # Save classifications to a text file
-            save_classifications(classifications)
+            # Classifications are saved as they change; also export them to a text file
+            save_classifications(dict(classifications.items()))
 
         elif choice == '6':
             # Clear all classifications
             confirm_clear = input("Are you sure you want to clear all classifications? (yes/no): ").strip().lower()
             if confirm_clear == 'yes':
                 classifications.clear()
-                save_classifications(classifications)  # Optionally save empty state
                 print("All classifications have been cleared.")
             else:
                 print("Clear operation canceled.")
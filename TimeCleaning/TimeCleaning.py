@@ -1,7 +1,14 @@
 import os
+import sys
 import openpyxl
 import re
 
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CellCache import memoize_cleaner, print_cache_stats
+from JobSpec import parse_job
+
 def get_input_file(default_directory):
     """Prompt user to input the name of the Excel file."""
     while True:
@@ -39,6 +46,7 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
+@memoize_cleaner
 def format_time(time_string):
     """Format time strings to 'HH:MM' in 24-hour format."""
     if not isinstance(time_string, str):
@@ -106,13 +114,25 @@ def clean_times(input_file, column_indices, output_file):
     print(f"Processing complete:")
     print(f"Total cells processed: {total_processed}")
     print(f"Changes made: {changes_made}")
+    print_cache_stats()
     print(f"Results saved to: {output_file}")
 
-# Main execution flow
-default_directory = os.getcwd()
+def main(argv=None):
+    """Main execution flow."""
+    # Run without prompts when a job spec or flags are given
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Standardize times in the given columns to 24-hour 'HH:MM'.")
+    if job is not None:
+        clean_times(job['input'], job['columns'], job['output_file'])
+        return
+
+    default_directory = os.getcwd()
+
+    input_excel_file = get_input_file(default_directory)
+    columns_to_clean = get_columns_to_clean()
+    output_excel_file = get_output_file_details(default_directory)
 
-input_excel_file = get_input_file(default_directory)
-columns_to_clean = get_columns_to_clean()
-output_excel_file = get_output_file_details(default_directory)
+    clean_times(input_excel_file, columns_to_clean, output_excel_file)
 
-clean_times(input_excel_file, columns_to_clean, output_excel_file)
+if __name__ == "__main__":
+    main()
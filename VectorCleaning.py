@@ -0,0 +1,194 @@
+"""Vectorized column cleaners backed by pandas string operations.
+
+Each cleaner takes the raw values of one column and returns a list of new
+values of the same length, following exactly the same rules as the per-cell
+cleaners in Main.py, DateCleaning.py, TimeCleaning.py and RemoveText.py.
+Unchanged cells keep their original value object, so the caller can write
+back only the cells that differ.
+
+Strings are factorized first: the regex work runs once per distinct string
+and the results are scattered back to every cell holding that string.
+
+The tools do not use these cleaners: pandas string operations on text still
+run the regex once per string, so they are no faster than the memoized
+per-cell cleaners, and slower on columns with many distinct values.
+benchmarks/bench_vector_cleaning.py compares the two.
+"""
+import sys
+import re
+import datetime
+import numpy as np
+import pandas as pd
+from DateEngine import DATE_PATTERN as DATE_REGEX, normalize_date
+
+# Every character for which str.isdigit() is true, so that removing the rest
+# gives the same result as ''.join(filter(str.isdigit, text))
+DIGIT_CHARS = ''.join(c for c in map(chr, range(sys.maxunicode + 1)) if c.isdigit())
+NON_DIGIT_PATTERN = '[^' + re.escape(DIGIT_CHARS) + ']+'
+WHITESPACE_PATTERN = r'\s+'
+
+# The shared date engine's pattern, anchored because str.extract searches
+DATE_PATTERN = '^' + DATE_REGEX.pattern
+
+# Main.py time pattern for H:MM or HH:MM
+MAIN_TIME_PATTERN = r'^(\d{1,2}):(\d{2})$'
+
+# TimeCleaning.py time patterns, tried in the same order
+TIME_PATTERNS = [
+    r'^(\d{1,2}):(\d{1,2})',
+    r'^(\d{2})(\d{2})',
+    r'^(\d{1,2})[:.。](\d{1,2})'
+]
+
+def to_object_array(values):
+    """Copy column values into a 1-D object array without any type inference."""
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+def factorize_strings(array):
+    """Find the string cells of a column and factorize them into distinct values."""
+    positions = np.flatnonzero([isinstance(value, str) for value in array])
+    codes, uniques = pd.factorize(pd.Series(array[positions], dtype=object))
+    return positions, codes, pd.Series(uniques, dtype=object)
+
+def scatter(array, positions, codes, results):
+    """Write per-distinct-string results back to every cell holding that string."""
+    array[positions] = results.to_numpy(dtype=object)[codes]
+    return array.tolist()
+
+def to_int(parts):
+    """Convert digit strings to integers (int() accepts any Unicode digit)."""
+    return parts.map(int)
+
+def int_text(parts):
+    """Convert digit strings to their integer text without leading zeros."""
+    return to_int(parts).map(str)
+
+def two_digits(numbers):
+    """Format integers as zero-padded two-digit text."""
+    return numbers.map(str).str.zfill(2)
+
+def remove_whitespace(strings):
+    """Vectorized ''.join(text.split())."""
+    return strings.str.replace(WHITESPACE_PATTERN, '', regex=True)
+
+def keep_digits(strings):
+    """Vectorized ''.join(filter(str.isdigit, text))."""
+    return strings.str.replace(NON_DIGIT_PATTERN, '', regex=True)
+
+def format_dates(strings):
+    """Format distinct date strings as 'YYYY年M月D日', keeping unmatched strings."""
+    parts = remove_whitespace(strings).str.extract(DATE_PATTERN).astype(object)
+    matched = parts[0].notna()
+    results = strings.copy()
+    if matched.any():
+        parts = parts[matched]
+        month = parts[1].fillna(parts[3]).fillna(parts[5])
+        day = parts[2].fillna(parts[4]).fillna(parts[6])
+        results[matched] = parts[0] + '年' + int_text(month) + '月' + int_text(day) + '日'
+    return results
+
+def fill_valid_times(results, hours, minutes):
+    """Write HH:MM into results for the parsed hours and minutes that form a valid time.
+
+    Returns the index of the rows that were filled in.
+    """
+    if hours.empty:
+        return hours.index
+    hours = to_int(hours)
+    minutes = to_int(minutes)
+    valid = hours.between(0, 23) & minutes.between(0, 59)
+    hours = hours[valid]
+    minutes = minutes[valid]
+    if not hours.empty:
+        results.loc[hours.index] = two_digits(hours) + ':' + two_digits(minutes)
+    return hours.index
+
+def fill_matched_times(results, strings, pattern):
+    """Fill in the valid times of the strings that match a time pattern.
+
+    Returns the strings that still have no valid time.
+    """
+    parts = strings.str.extract(pattern).astype(object)
+    matched = parts[0].notna()
+    done = fill_valid_times(results, parts.loc[matched, 0], parts.loc[matched, 1])
+    return strings.drop(done)
+
+def vector_clean_text(values):
+    """Remove all whitespace from the text cells of a column."""
+    array = to_object_array(values)
+    positions, codes, strings = factorize_strings(array)
+    return scatter(array, positions, codes, remove_whitespace(strings))
+
+def vector_clean_date(values):
+    """Remove spaces from the text cells of a column and format them as 'YYYY年M月D日'.
+
+    Native date and datetime values are formatted as well.
+    """
+    array = to_object_array(values)
+    for i in np.flatnonzero([isinstance(value, datetime.date) for value in array]):
+        array[i] = normalize_date(array[i])
+    positions, codes, strings = factorize_strings(array)
+    return scatter(array, positions, codes, format_dates(strings))
+
+def vector_clean_time(values):
+    """Format the cells of a column as 'HH:MM' or replace them with N/A (Main.py rules)."""
+    array = to_object_array(values)
+    positions, codes, strings = factorize_strings(array)
+    stripped = strings.str.strip()
+    results = pd.Series("N/A", index=strings.index, dtype=object)
+
+    # H:MM or HH:MM
+    remaining = fill_matched_times(results, stripped, MAIN_TIME_PATTERN)
+
+    # Otherwise use the first four (or three) digits of the text
+    digits = keep_digits(remaining)
+    lengths = digits.str.len()
+    long_digits = digits[lengths >= 4]
+    fill_valid_times(results, long_digits.str[:2], long_digits.str[2:4])
+    short_digits = digits[lengths == 3]
+    fill_valid_times(results, short_digits.str[:1], short_digits.str[1:])
+
+    # Every cell that is not text becomes N/A
+    new_values = to_object_array(["N/A"] * len(array))
+    return scatter(new_values, positions, codes, results)
+
+def vector_clean_number(values):
+    """Keep only digits in the text cells of a column and convert them to integers (Main.py rules)."""
+    array = to_object_array(values)
+    positions, codes, strings = factorize_strings(array)
+    digits = keep_digits(strings)
+    numbers = pd.Series([int(d) if d else None for d in digits], index=strings.index, dtype=object)
+    # Text that already reads as the resulting number is left untouched
+    unchanged = strings == numbers.map(str)
+    return scatter(array, positions, codes, numbers.where(~unchanged, strings))
+
+def vector_clean_numeric(values):
+    """Convert every text cell of a column to the integer of its digits, or None (RemoveText.py rules)."""
+    array = to_object_array(values)
+    positions, codes, strings = factorize_strings(array)
+    digits = keep_digits(strings)
+    numbers = pd.Series([int(d) if d else None for d in digits], index=strings.index, dtype=object)
+    return scatter(array, positions, codes, numbers)
+
+def vector_format_time(values):
+    """Format the cells of a column as 'HH:MM' or N/A (TimeCleaning.py rules).
+
+    Empty cells and blank text become N/A, and other non-text values are
+    formatted from their string form.
+    """
+    array = to_object_array(values)
+    texts = to_object_array(array)
+    new_values = to_object_array(["N/A"] * len(array))
+    for i, value in enumerate(array):
+        if value is not None and not isinstance(value, str):
+            texts[i] = str(value)
+
+    positions, codes, strings = factorize_strings(texts)
+    cleaned = remove_whitespace(strings)
+    results = pd.Series("N/A", index=strings.index, dtype=object)
+    remaining = cleaned
+    for pattern in TIME_PATTERNS:
+        remaining = fill_matched_times(results, remaining, pattern)
+    return scatter(new_values, positions, codes, results)
@@ -0,0 +1,52 @@
+"""Tune the blocking matcher's recall against its cost on a product catalogue.
+
+Looks up misspelled copies of catalogue products with every combination of
+prefix length and length band width, and prints, for each, the products
+compared per lookup and the recall against the full scan (same best match,
+and the share of the full scan's top-5 products found). Run it on your own
+product list to choose PREFIX_LENGTH and BAND_WIDTH in matching/blocking.py.
+
+Usage: python benchmarks/bench_blocking.py [product list file (.txt/.db) or synthetic product count] [queries]
+"""
+import os
+import sys
+import time
+import random
+
+# Make the shared modules in the repository root and the matching tool importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'matching'))
+
+from similarity import get_sorted_matches
+from blocking import BlockingMatcher
+from matching_v2 import read_product_list
+from bench_matching import build_catalogue, misspell, recall
+
+PREFIX_LENGTHS = [0, 1, 2]
+BAND_WIDTHS = [2, 4, 8]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    source = argv[0] if len(argv) > 0 else '20000'
+    query_count = int(argv[1]) if len(argv) > 1 else 200
+
+    random.seed(0)
+    products = build_catalogue(int(source)) if source.isdigit() else read_product_list(source)
+    queries = [misspell(random.choice(products)) for _ in range(query_count)]
+    expected = [get_sorted_matches(query, products) for query in queries]
+    print(f"Products: {len(products)}, queries: {query_count}")
+    print(f"{'prefix':>6} {'band':>4} {'compared/lookup':>16} {'ms/lookup':>10} {'best match':>11} {'recall@5':>9}")
+
+    for prefix_length in PREFIX_LENGTHS:
+        for band_width in BAND_WIDTHS:
+            matcher = BlockingMatcher(products, prefix_length, band_width)
+            start = time.perf_counter()
+            results = [matcher.get_sorted_matches(query) for query in queries]
+            lookup_ms = (time.perf_counter() - start) / query_count * 1000
+            same_top = sum(result[0] == wanted[0] for result, wanted in zip(results, expected)) / query_count
+            print(f"{prefix_length:>6} {band_width:>4} {matcher.comparisons / query_count:>16.0f} "
+                  f"{lookup_ms:>10.2f} {same_top:>11.1%} {recall(results, expected):>9.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark sheet-parallel Chinese conversion against the serial path.
+
+Builds a synthetic multi-sheet workbook of Simplified Chinese product names,
+converts it serially and with 1..N worker processes, checks that every
+parallel result matches the serial one, and prints the timings.
+
+Usage: python benchmarks/bench_chinese_parallel.py [sheets] [rows per sheet] [max workers]
+"""
+import os
+import sys
+import time
+import random
+import openpyxl
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChineseConverter import ChineseConverter
+
+WORDS = ['饼干', '牛奶', '面包', '蛋糕', '巧克力', '咖啡', '绿茶', '矿泉水', '薯片', '糖果',
+         '简装', '礼盒', '原味', '香辣', '发酵', '头发', '里面', '后来', '干净', '钟表']
+
+def build_workbook(sheets, rows):
+    """Build a workbook of random product names, with mostly distinct strings per sheet."""
+    random.seed(0)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for i in range(sheets):
+        ws = wb.create_sheet(f"Sheet{i + 1}")
+        for _ in range(rows):
+            name = ''.join(random.choice(WORDS) for _ in range(4))
+            ws.append([name, f"{name}{random.randint(1, 999)}号", random.randint(1, 100)])
+    return wb
+
+def sheet_values(wb):
+    """Get every value of a workbook for comparing results."""
+    return [[tuple(row) for row in ws.iter_rows(values_only=True)] for ws in wb.worksheets]
+
+def main():
+    sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    print(f"Workbook: {sheets} sheets x {rows} rows")
+
+    wb = build_workbook(sheets, rows)
+    start = time.perf_counter()
+    converter = ChineseConverter(cache_file=None)
+    for ws in wb.worksheets:
+        converter.convert_worksheet(ws)
+    serial_time = time.perf_counter() - start
+    expected = sheet_values(wb)
+    print(f"Serial: {serial_time:.2f}s")
+
+    for workers in range(1, max_workers + 1):
+        wb = build_workbook(sheets, rows)
+        start = time.perf_counter()
+        ChineseConverter(cache_file=None).convert_workbook_parallel(wb, workers)
+        elapsed = time.perf_counter() - start
+        identical = sheet_values(wb) == expected
+        print(f"{workers} worker(s): {elapsed:.2f}s, speedup {serial_time / elapsed:.2f}x, identical output: {identical}")
+
+if __name__ == "__main__":
+    main()
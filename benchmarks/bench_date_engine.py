@@ -0,0 +1,72 @@
+"""Micro-benchmark of per-cell date parsing before and after the shared date engine.
+
+Parses a mixed-format date column cell by cell with the previous
+three-regex approach and with DateEngine.normalize_date (no memoization on
+either side), checks that both give the same results, and prints the cost
+per cell.
+
+Usage: python benchmarks/bench_date_engine.py [cells]
+"""
+import os
+import re
+import sys
+import time
+import random
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DateEngine import normalize_date
+
+def legacy_format_date(value):
+    """The previous per-cell parser: patterns rebuilt and tried one after another."""
+    cleaned_value = ''.join(value.split())
+    date_patterns = [
+        r'(\d{4})-(\d{1,2})-(\d{1,2})',
+        r'(\d{4})年(\d{1,2})月(\d{1,2})日',
+        r'(\d{4})(\d{2})(\d{2})'
+    ]
+    for pattern in date_patterns:
+        match = re.match(pattern, cleaned_value)
+        if match:
+            year = match.group(1)
+            month = str(int(match.group(2)))
+            day = str(int(match.group(3)))
+            return f"{year}年{month}月{day}日"
+    return None
+
+def build_column(cells):
+    """Build a column mixing every supported format, padded text and non-dates."""
+    random.seed(0)
+    formats = [
+        lambda y, m, d: f"{y}-{m:02d}-{d:02d}",
+        lambda y, m, d: f"{y}-{m}-{d}",
+        lambda y, m, d: f"{y}年{m}月{d}日",
+        lambda y, m, d: f"{y}{m:02d}{d:02d}",
+        lambda y, m, d: f" {y} - {m} - {d} ",
+        lambda y, m, d: "N/A",
+        lambda y, m, d: "未知",
+    ]
+    return [random.choice(formats)(random.randint(2020, 2025), random.randint(1, 12), random.randint(1, 28))
+            for _ in range(cells)]
+
+def time_per_cell(parse, column):
+    """Parse every cell, returning (nanoseconds per cell, results)."""
+    start = time.perf_counter()
+    results = [parse(value) for value in column]
+    return (time.perf_counter() - start) / len(column) * 1e9, results
+
+def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    column = build_column(cells)
+
+    legacy_ns, legacy_results = time_per_cell(legacy_format_date, column)
+    engine_ns, engine_results = time_per_cell(normalize_date, column)
+
+    print(f"Cells: {cells}")
+    print(f"Before (three re.match calls): {legacy_ns:.0f} ns/cell")
+    print(f"After (DateEngine):            {engine_ns:.0f} ns/cell")
+    print(f"Speedup: {legacy_ns / engine_ns:.2f}x, identical results: {legacy_results == engine_results}")
+
+if __name__ == "__main__":
+    main()
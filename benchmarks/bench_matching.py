@@ -0,0 +1,113 @@
+"""Benchmark of product name lookups in matching_v2.
+
+Builds a synthetic catalogue of CJK product names and queries that are
+misspelled copies of catalogue entries, then looks every query up with the
+full scan and with each candidate matcher. Prints the time per lookup and
+how often the matcher finds the same best match and the same top-5
+scores as the full scan (products with equal scores may be listed
+differently at the end of the list), its recall of the full scan's top-5
+products, how many comparisons it made, and how many products it skipped by
+the top-k bounds instead of scoring them in full.
+
+Usage: python benchmarks/bench_matching.py [products] [queries]
+"""
+import os
+import sys
+import time
+import random
+
+# Make the shared modules in the repository root and the matching tool importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'matching'))
+
+from similarity import get_sorted_matches, pruning_stats
+from matchers import MATCHERS, build_fuzzy_matcher
+
+# Building blocks of the synthetic product names
+BRANDS = ['統一', '味全', '光泉', '義美', '桂格', '維力', '金車', '黑松', '泰山', '愛之味', '可口', '百事']
+ITEMS = ['牛奶', '豆漿', '紅茶', '綠茶', '奶茶', '咖啡', '果汁', '麥片', '餅乾', '泡麵', '布丁', '優格', '蘇打', '礦泉水']
+FLAVOURS = ['原味', '巧克力', '草莓', '香草', '蜂蜜', '檸檬', '蘋果', '芒果', '抹茶', '焦糖', '無糖', '低糖']
+SIZES = ['250ml', '330ml', '500ml', '600ml', '1L', '2L', '100g', '200g', '6入', '12入', '24入']
+TYPO_CHARS = '的一是不了人我在有他這中大來上國個到說們為子和你地出道也時年'
+
+def build_catalogue(size):
+    """Build a list of distinct product names."""
+    products = set()
+    while len(products) < size:
+        name = random.choice(BRANDS) + random.choice(ITEMS) + random.choice(FLAVOURS) + random.choice(SIZES)
+        if random.random() < 0.5:
+            name += f"{random.randint(1, 999):03d}"
+        products.add(name)
+    return sorted(products)
+
+def misspell(name):
+    """Replace, drop or insert a character or two, like a hand-typed cell."""
+    chars = list(name)
+    for _ in range(random.randint(1, 2)):
+        position = random.randrange(len(chars))
+        edit = random.choice(['replace', 'drop', 'insert'])
+        if edit == 'replace':
+            chars[position] = random.choice(TYPO_CHARS)
+        elif edit == 'drop' and len(chars) > 2:
+            del chars[position]
+        else:
+            chars.insert(position, random.choice(TYPO_CHARS))
+    return ''.join(chars)
+
+def time_lookups(lookup, queries):
+    """Look up every query, returning (milliseconds per lookup, results)."""
+    start = time.perf_counter()
+    results = [lookup(query) for query in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+def recall(results, expected):
+    """Fraction of the expected top products that are also in the results."""
+    found = total = 0
+    for result, wanted in zip(results, expected):
+        result_products = {product for product, _ in result}
+        found += sum(product in result_products for product, _ in wanted)
+        total += len(wanted)
+    return found / total if total else 1.0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    product_count = int(argv[0]) if len(argv) > 0 else 20000
+    query_count = int(argv[1]) if len(argv) > 1 else 200
+
+    random.seed(0)
+    products = build_catalogue(product_count)
+    queries = [misspell(random.choice(products)) for _ in range(query_count)]
+    print(f"Products: {product_count}, queries: {query_count}")
+
+    scan_ms, expected = time_lookups(lambda query: get_sorted_matches(query, products), queries)
+    print(f"exhaustive: {scan_ms:.2f} ms/lookup")
+
+    for name in MATCHERS:
+        if name == 'exhaustive':
+            continue
+        start = time.perf_counter()
+        matcher = build_fuzzy_matcher(name, products)
+        build_seconds = time.perf_counter() - start
+        pruning_stats.clear()
+        comparisons_before = getattr(matcher, 'comparisons', 0)
+        matcher_ms, results = time_lookups(matcher.get_sorted_matches, queries)
+        same_top = sum(result[0] == wanted[0] for result, wanted in zip(results, expected))
+        same_list = sum([score for _, score in result] == [score for _, score in wanted]
+                        for result, wanted in zip(results, expected))
+        print(f"{name}: {matcher_ms:.2f} ms/lookup ({scan_ms / matcher_ms:.1f}x faster, built in {build_seconds:.2f} s), "
+              f"same best match {same_top / query_count:.1%}, same top-5 scores {same_list / query_count:.1%}, "
+              f"recall@5 {recall(results, expected):.1%}")
+        if hasattr(matcher, 'comparisons'):
+            comparisons = (matcher.comparisons - comparisons_before) / query_count
+            print(f"  {comparisons:.0f} comparisons/lookup ({comparisons / len(products):.1%} of the products)")
+        compared = sum(pruning_stats.values())
+        if compared:
+            pruned = compared - pruning_stats['scored']
+            print(f"  {compared / query_count:.0f} products/lookup, {pruned / compared:.1%} pruned "
+                  f"(length bound {pruning_stats['length'] / query_count:.0f}, "
+                  f"quick_ratio {pruning_stats['quick_ratio'] / query_count:.0f}, "
+                  f"scored {pruning_stats['scored'] / query_count:.0f} per lookup)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark of scoring distinct product names in worker processes.
+
+Scores the same misspelled values against a synthetic catalogue with 1, 2,
+4, ... worker processes (up to the number of CPUs), checks that every run
+gives the same matches, and prints the speedup over one process.
+
+Usage: python benchmarks/bench_parallel_matching.py [products] [values] [matcher]
+"""
+import os
+import sys
+import time
+import random
+
+# Make the shared modules in the repository root and the matching tool importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'matching'))
+
+from matchers import build_matcher, score_values
+from bench_matching import build_catalogue, misspell
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    product_count = int(argv[0]) if len(argv) > 0 else 20000
+    value_count = int(argv[1]) if len(argv) > 1 else 2000
+    matcher_name = argv[2] if len(argv) > 2 else 'ngram'
+
+    random.seed(0)
+    products = build_catalogue(product_count)
+    values = list(dict.fromkeys(misspell(random.choice(products)) for _ in range(value_count)))
+    print(f"Products: {product_count}, distinct values: {len(values)}, matcher: {matcher_name}, CPUs: {os.cpu_count()}")
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+        worker_counts.append(worker_counts[-1] * 2)
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        # Each run builds its matcher(s), as a run of matching_v2 does
+        matcher = build_matcher(matcher_name, products) if workers == 1 else None
+        results = score_values(values, products, matcher_name, matcher, workers)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline = (seconds, results)
+        print(f"{workers} workers: {seconds:.2f} s ({baseline[0] / seconds:.2f}x), "
+              f"same matches: {results == baseline[1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark of SmartTag's concurrent classification against the local stub server.
+
+Classifies the same product names with increasing concurrency limits, then
+with increasing batch sizes, checks that every run agrees with the first
+one's classifications, and prints the throughput of each with the API
+requests and tokens per item. Finally runs through a response cache: a
+first run, a re-run, a run where half the names are full-width spelling
+variants and half are new, and a run with the one-by-one prompt, printing
+the cache hit rate of each.
+
+Usage: python benchmarks/bench_smarttag.py [items] [latency seconds] [rate limit per second, 0 for none] [drop rate]
+"""
+import os
+import sys
+import time
+import tempfile
+from collections import Counter
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_groq_server import StubServer
+
+CONCURRENCY_LIMITS = [1, 4, 16, 64]
+BATCH_SIZES = [1, 10, 50, 200]
+BATCH_CONCURRENCY = 16
+
+def build_items(count, start=0):
+    """Build distinct product names of every category."""
+    names = ['紅茶', '牛奶', '餅乾', '泡麵', '洗髮精', '礦泉水', '布丁', '衛生紙']
+    return [f"{names[i % len(names)]}{i:05d}" for i in range(start, start + count)]
+
+def full_width(name):
+    """Spell a name's digits in full width, which the cache normalizes back."""
+    return name.translate({ord(digit): ord(digit) + 0xFEE0 for digit in '0123456789'})
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    item_count = int(argv[0]) if len(argv) > 0 else 400
+    latency = float(argv[1]) if len(argv) > 1 else 0.1
+    rate_limit = int(argv[2]) if len(argv) > 2 and int(argv[2]) > 0 else None
+    drop_rate = float(argv[3]) if len(argv) > 3 else 0.0
+
+    server = StubServer(latency=latency, rate_limit=rate_limit, drop_rate=drop_rate).start()
+    os.environ['GROQ_BASE_URL'] = server.base_url
+    os.environ.setdefault('GROQ_API_KEY', 'stub')
+    import SmartTag
+    from ResponseCache import ResponseCache, normalize_name
+
+    items = build_items(item_count)
+    print(f"Items: {item_count}, stub latency: {latency}s, rate limit: {rate_limit or 'none'}, "
+          f"batched answers drop: {drop_rate:.0%}")
+    baseline = None
+
+    def run(label, concurrency, batch_size, run_items=items, cache=None):
+        nonlocal baseline
+        stats = Counter()
+        start = time.perf_counter()
+        results = SmartTag.classify_items(run_items, concurrency, batch_size, stats, cache)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline = {normalize_name(item): category for item, category in results.items()}
+        agreeing = all(baseline.get(normalize_name(item), category) == category for item, category in results.items())
+        line = (f"{label}: {len(run_items) / seconds:8.1f} items/s, "
+                f"{stats['requests'] / len(run_items):5.3f} requests/item, {stats['tokens'] / len(run_items):6.1f} tokens/item, "
+                f"classified: {len(results)}, agreeing: {agreeing}")
+        if cache is not None:
+            line += f", cache hits: {stats['cache_hits'] / len(run_items):.0%}"
+        print(line)
+
+    for concurrency in CONCURRENCY_LIMITS:
+        run(f"concurrency {concurrency:>3}", concurrency, 1)
+    for batch_size in BATCH_SIZES:
+        run(f"batch size {batch_size:>4}", BATCH_CONCURRENCY, batch_size)
+
+    half = item_count // 2
+    overlapping = [full_width(item) for item in items[:half]] + build_items(item_count - half, start=item_count)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'response_cache.db'))
+        run("cache, first run ", BATCH_CONCURRENCY, 50, items, cache)
+        run("cache, re-run    ", BATCH_CONCURRENCY, 50, items, cache)
+        run("cache, half new  ", BATCH_CONCURRENCY, 50, overlapping, cache)
+        run("cache, one-by-one", BATCH_CONCURRENCY, 1, items, cache)
+        cache.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
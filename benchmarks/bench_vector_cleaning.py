@@ -0,0 +1,82 @@
+"""Benchmark of Main.py's memoized per-cell cleaners against the pandas column cleaners.
+
+Cleans a text, date, time and number column of the given size with a low
+number of distinct values and with half of the cells distinct, once cell by cell through Main.py's
+memoized cleaners (caches cleared first) and once with VectorCleaning,
+checks that both give the same results, and prints the time of each.
+
+Usage: python benchmarks/bench_vector_cleaning.py [cells] [low distinct values]
+"""
+import os
+import sys
+import time
+import random
+import datetime
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import VectorCleaning
+from Main import clean_text_value, clean_date_value, clean_time_value, clean_number_value
+
+def pad(text, k):
+    """Surround a text with k-dependent spaces, giving distinct cells that clean to the same value."""
+    return ' ' * (k % 8) + text + ' ' * (k // 8)
+
+def make_date(i):
+    """Get the i-th distinct date cell, cycling through the supported formats and non-dates."""
+    k = i // 4
+    day = datetime.date(1900, 1, 1) + datetime.timedelta(days=k % 73000)
+    text = [f"{day:%Y-%m-%d}", f"{day.year}年{day.month}月{day.day}日", f"{day:%Y%m%d}", f"未知{k}"][i % 4]
+    return pad(text, k // 73000)
+
+def make_time(i):
+    """Get the i-th distinct time cell, cycling through H:MM, HHMM, digits in text and non-times."""
+    k = i // 4
+    hour, minute = k % 24, k // 24 % 60
+    text = [f"{hour}:{minute:02d}", f"{hour:02d}{minute:02d}時", f"約{hour}點{minute:02d}分", f"N/A{k}"][i % 4]
+    return pad(text, k // 1440)
+
+# (name, per-cell cleaner, column cleaner, value generator)
+CLEANERS = [
+    ('text', clean_text_value, VectorCleaning.vector_clean_text,
+     lambda i: f" 產品 {i} 號 " if i % 3 else f"Item{i}"),
+    ('date', clean_date_value, VectorCleaning.vector_clean_date, make_date),
+    ('time', clean_time_value, VectorCleaning.vector_clean_time, make_time),
+    ('number', clean_number_value, VectorCleaning.vector_clean_number,
+     lambda i: [f"{i}元", f" {i} ", str(i), f"NT${i:,}"][i % 4]),
+]
+
+def build_column(make_value, cells, distinct):
+    """Build a column of cells drawn from the given number of distinct values."""
+    random.seed(0)
+    values = [make_value(i) for i in range(distinct)]
+    return [values[random.randrange(distinct)] for _ in range(cells)] if distinct < cells else values
+
+def time_cell_cleaner(cleaner, column):
+    """Clean every cell with a memoized cleaner from an empty cache, returning (seconds, results)."""
+    cleaner.cache_clear()
+    start = time.perf_counter()
+    results = [cleaner(value) for value in column]
+    return time.perf_counter() - start, results
+
+def time_column_cleaner(cleaner, column):
+    """Clean the column at once, returning (seconds, results)."""
+    start = time.perf_counter()
+    results = cleaner(column)
+    return time.perf_counter() - start, results
+
+def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    low = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    for label, distinct in [('low', low), ('high', cells // 2)]:
+        print(f"\n{cells} cells, {distinct} distinct values ({label} cardinality):")
+        for name, cell_cleaner, column_cleaner, make_value in CLEANERS:
+            column = build_column(make_value, cells, distinct)
+            cell_seconds, cell_results = time_cell_cleaner(cell_cleaner, column)
+            column_seconds, column_results = time_column_cleaner(column_cleaner, column)
+            print(f"{name}: per cell {cell_seconds:.2f} s, pandas {column_seconds:.2f} s "
+                  f"({cell_seconds / column_seconds:.2f}x), identical results: {cell_results == column_results}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Local stub of the Groq chat completions endpoint for testing SmartTag offline.
+
+Answers POST /openai/v1/chat/completions after a fixed latency, classifying
+the quoted product name in the prompt by keyword. Batched prompts listing
+the products as a JSON array get a JSON object of categories, leaving out
+a share of them with --drop-rate so the re-queries can be tested. Answers
+longer than max_tokens are cut off with finish_reason 'length'. With a rate
+limit, extra requests in the same second get HTTP 429 like the real API.
+
+Run it on its own and point SmartTag at it:
+    python benchmarks/stub_groq_server.py --port 8765 --latency 0.2
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=stub python SmartTag.py
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BEVERAGE_WORDS = ['茶', '水', '奶', '咖啡', '汁', '酒', '飲', 'tea', 'milk', 'juice', 'water', 'coffee', 'cola', 'soda']
+FOOD_WORDS = ['餅', '麵', '飯', '糖', '布丁', '麥片', '包', 'bread', 'cake', 'noodle', 'rice', 'snack']
+
+def classify(name):
+    """Classify a product name by keyword, as the stub's model answer."""
+    lowered = name.lower()
+    if any(word in lowered for word in BEVERAGE_WORDS):
+        return 'beverage'
+    if any(word in lowered for word in FOOD_WORDS):
+        return 'food'
+    return 'other'
+
+def count_tokens(text):
+    """Count tokens the way the stub bills them: four ASCII characters, or one other character, per token."""
+    ascii_chars = sum(ch.isascii() for ch in text)
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+def answer_prompt(prompt, drop_rate=0.0):
+    """Answer a single product prompt, or a batched one with a JSON object."""
+    match = re.search(r"Products: (\[.*\])\s*$", prompt, re.S)
+    if match:
+        names = json.loads(match.group(1))
+        return json.dumps({name: classify(name) for name in names if random.random() >= drop_rate}, ensure_ascii=False)
+    match = re.search(r"classify '(.*)' as", prompt, re.S)
+    return classify(match.group(1) if match else prompt)
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.endswith('/chat/completions'):
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+        if not self.server.take_request_slot():
+            self.send_json(429, {"error": {"message": "rate limit reached"}}, {'retry-after': '1'})
+            return
+
+        request = json.loads(body)
+        time.sleep(self.server.latency)
+        prompt = request['messages'][-1]['content']
+        content = self.server.answer(prompt, self.server.drop_rate)
+        finish_reason = 'stop'
+        max_tokens = request.get('max_tokens')
+        if max_tokens and count_tokens(content) > max_tokens:
+            while count_tokens(content) > max_tokens:
+                content = content[:-1]
+            finish_reason = 'length'
+        self.server.count_request()
+        prompt_tokens = sum(count_tokens(message['content']) for message in request['messages'])
+        completion_tokens = count_tokens(content)
+        self.send_json(200, {
+            "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": request.get('model', ''),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def send_json(self, status, data, headers=None):
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.2, rate_limit=None, answer=answer_prompt, drop_rate=0.0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.latency = latency
+        # Maximum requests per second, or None for no limit
+        self.rate_limit = rate_limit
+        self.answer = answer
+        # Share of the products left out of batched answers
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def take_request_slot(self):
+        """Count a request against the rate limit, returning False if it is over the limit."""
+        if self.rate_limit is None:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start = now
+                self.window_requests = 0
+            if self.window_requests >= self.rate_limit:
+                return False
+            self.window_requests += 1
+            return True
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def start(self):
+        """Serve in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Groq chat completions server.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds before each answer")
+    parser.add_argument('--rate-limit', type=int, help="maximum requests per second")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="share of the products left out of batched answers")
+    args = parser.parse_args()
+    server = StubServer(args.port, args.latency, args.rate_limit, drop_rate=args.drop_rate)
+    print(f"Stub Groq server on {server.base_url} (latency {args.latency}s)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""BK-tree over Levenshtein distance for the product catalogue.
+
+Every child of a node sits at a known edit distance from it, so by the
+triangle inequality a query only has to visit children whose distance is
+within the search radius of its own distance to the node. This answers
+"all products within distance d" and "k nearest products" without
+computing the distance to every product. As a matcher backend, the 50
+products nearest by edit distance are rescored with similarity_ratio, so
+the scores and thresholds stay the same as with the other matchers and
+there are always five candidates to choose from. Products that are close by
+similarity_ratio but not by edit distance can be missed, so the top 5 may
+differ from the full scan's (benchmarks/bench_matching.py prints the recall).
+"""
+import heapq
+from similarity import get_top_matches
+
+# Nearest products rescored per query by the matcher backend
+CANDIDATE_COUNT = 50
+
+def pattern_masks(pattern):
+    """Get {character: bit mask of its positions in the pattern} for distance_to()."""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+def distance_to(pattern, masks, text):
+    """Levenshtein distance from a pattern, given its pattern_masks(), to a text.
+
+    Uses Myers' bit-parallel algorithm: one column of the edit distance table
+    is kept as bit vectors of +1/-1 differences, so each character of the
+    text costs a few integer operations instead of a pass over the pattern.
+    """
+    length = len(pattern)
+    if not length:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    plus, minus = full, 0
+    distance = length
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | minus
+        xh = (((eq & plus) + plus) ^ plus) | eq
+        horizontal_plus = minus | ~(xh | plus)
+        horizontal_minus = plus & xh
+        if horizontal_plus & last:
+            distance += 1
+        elif horizontal_minus & last:
+            distance -= 1
+        horizontal_plus = (horizontal_plus << 1) | 1
+        horizontal_minus <<= 1
+        plus = (horizontal_minus | ~(xv | horizontal_plus)) & full
+        minus = horizontal_plus & xv
+    return distance
+
+def levenshtein(a, b):
+    """Number of single character insertions, deletions and substitutions turning a into b."""
+    return distance_to(a, pattern_masks(a), b)
+
+class BKTree:
+    """Metric index of product names with incremental insertion."""
+
+    def __init__(self, products=(), candidate_count=CANDIDATE_COUNT):
+        self.candidate_count = candidate_count
+        self.products = []
+        # Node: [product, insertion position, {distance: child node}]
+        self.root = None
+        self.size = 0
+        # Distances computed by queries, for the benchmarks
+        self.comparisons = 0
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, product):
+        """Insert a product, ignoring products already in the tree."""
+        new_node = [product, self.size, {}]
+        if self.root is None:
+            self.root = new_node
+            self.products.append(product)
+            self.size += 1
+            return
+        masks = pattern_masks(product)
+        node = self.root
+        while True:
+            distance = distance_to(product, masks, node[0])
+            if distance == 0:
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = new_node
+                self.products.append(product)
+                self.size += 1
+                return
+            node = child
+
+    def within(self, query, max_distance):
+        """Get (product, distance) for every product within max_distance of the query, nearest first."""
+        found = []
+        masks = pattern_masks(query)
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            product, position, children = nodes.pop()
+            distance = distance_to(query, masks, product)
+            self.comparisons += 1
+            if distance <= max_distance:
+                found.append((distance, position, product))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    nodes.append(child)
+        return [(product, distance) for distance, _, product in sorted(found)]
+
+    def nearest(self, query, k, max_distance=None):
+        """Get (product, distance) for the k products nearest to the query, nearest first.
+
+        Products at the same distance are returned in insertion order.
+        """
+        if k <= 0:
+            return []
+        # Max-heap of (-distance, -position, product) holding the k nearest so far
+        best = []
+        radius = float('inf') if max_distance is None else max_distance
+        masks = pattern_masks(query)
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            product, position, children = nodes.pop()
+            distance = distance_to(query, masks, product)
+            self.comparisons += 1
+            if distance <= radius:
+                entry = (-distance, -position, product)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+                if len(best) == k:
+                    radius = min(radius, -best[0][0])
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    nodes.append(child)
+        return [(product, -distance) for distance, _, product in sorted(best, reverse=True)]
+
+    def get_sorted_matches(self, input_text, n=5):
+        """Get sorted matches with similarity ratios among the products nearest by edit distance."""
+        nearest = self.nearest(input_text, max(n, self.candidate_count))
+        return get_top_matches(input_text, [product for product, _ in nearest], n)
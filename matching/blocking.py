@@ -0,0 +1,99 @@
+"""Blocking candidate generation for product matching.
+
+Products are partitioned into blocks by their leading characters (usually
+the brand) and by length band. A query is only scored against the blocks
+with its own prefix and a nearby length, so a lookup costs about one block
+instead of the catalogue. When those blocks are empty it falls back, in
+order, to the query's prefix at any length, to any prefix at a nearby
+length, and finally to the whole catalogue.
+
+A misspelled leading character puts a query in the wrong block, so blocking
+trades recall for speed; benchmarks/bench_blocking.py measures both on a
+given catalogue to choose the settings.
+"""
+from collections import defaultdict
+from similarity import get_top_matches
+
+# Characters forming the prefix of a block (0 blocks by length only)
+PREFIX_LENGTH = 1
+
+# Lengths per band, and bands on each side of the query's band that are also compared
+BAND_WIDTH = 4
+NEIGHBOUR_BANDS = 1
+
+class BlockingMatcher:
+    """Scores a query against the products in its prefix and length blocks."""
+
+    def __init__(self, products, prefix_length=PREFIX_LENGTH, band_width=BAND_WIDTH,
+                 neighbour_bands=NEIGHBOUR_BANDS, fallback=True):
+        self.prefix_length = prefix_length
+        self.band_width = band_width
+        self.neighbour_bands = neighbour_bands
+        self.fallback = fallback
+        self.products = []
+        self.known = set()
+        # prefix -> length band -> positions of the products
+        self.blocks = defaultdict(lambda: defaultdict(list))
+        # Products scored by queries, for the benchmarks
+        self.comparisons = 0
+        for product in products:
+            self.insert(product)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['blocks'] = {prefix: dict(bands) for prefix, bands in self.blocks.items()}
+        return state
+
+    def __setstate__(self, state):
+        blocks = state['blocks']
+        self.__dict__.update(state)
+        self.blocks = defaultdict(lambda: defaultdict(list))
+        for prefix, bands in blocks.items():
+            self.blocks[prefix].update(bands)
+
+    def get_block(self, text):
+        """Get the (prefix, length band) of a text."""
+        return text[:self.prefix_length], len(text) // self.band_width
+
+    def insert(self, product):
+        """Put a product in its block at the end of the list."""
+        prefix, band = self.get_block(product)
+        self.blocks[prefix][band].append(len(self.products))
+        self.products.append(product)
+        self.known.add(product)
+
+    def add(self, product):
+        """Add a new product to its block, ignoring products already known."""
+        if product not in self.known:
+            self.insert(product)
+
+    def near_bands(self, bands, band):
+        """Collect the positions in the bands within reach of a band."""
+        positions = []
+        for near in range(band - self.neighbour_bands, band + self.neighbour_bands + 1):
+            positions.extend(bands.get(near, ()))
+        return positions
+
+    def candidates(self, query):
+        """Get the positions of the products in the query's blocks, falling back to wider blocks if empty."""
+        prefix, band = self.get_block(query)
+        bands = self.blocks.get(prefix, {})
+        positions = self.near_bands(bands, band)
+        if positions or not self.fallback:
+            return positions
+        # Same prefix, any length
+        positions = [position for block in bands.values() for position in block]
+        if positions:
+            return positions
+        # Any prefix, nearby length
+        positions = [position for other in self.blocks.values() for position in self.near_bands(other, band)]
+        if positions:
+            return positions
+        return list(range(len(self.products)))
+
+    def get_sorted_matches(self, input_text, n=5):
+        """Get sorted matches with similarity ratios among the products in the query's blocks."""
+        # List order keeps equal scores ranked as in the full scan
+        positions = sorted(self.candidates(input_text))
+        self.comparisons += len(positions)
+        return get_top_matches(input_text, [self.products[position] for position in positions], n)
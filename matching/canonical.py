@@ -0,0 +1,89 @@
+"""Canonical product name keys for exact lookups before fuzzy matching.
+
+Many near misses are only full-width/half-width forms, Simplified vs
+Traditional characters, case, spacing or punctuation. Every product's
+canonical key (NFKC, OpenCC s2t, lowercase, whitespace and punctuation
+removed) is computed once, so a cell whose key belongs to a single product
+is resolved with one dictionary lookup and treated as an exact match. A
+cell that is already a product name is always kept as it is. When several
+products share the cell's key, none of them is picked automatically: the
+cell goes on to the fuzzy matcher like any other.
+"""
+import unicodedata
+from ChineseConverter import ChineseConverter
+from CellCache import memoize_cleaner
+from similarity import get_sorted_matches
+
+# Converter for the keys, created on first use (no disk cache: products are converted in one batch)
+_converter = None
+
+def get_converter():
+    global _converter
+    if _converter is None:
+        _converter = ChineseConverter('s2t', cache_file=None)
+    return _converter
+
+def strip_key(text):
+    """Lowercase the text and drop whitespace and punctuation."""
+    return ''.join(ch for ch in text.lower() if not ch.isspace() and not unicodedata.category(ch).startswith('P'))
+
+@memoize_cleaner
+def canonical_key(text):
+    """Get the canonical key of a product name."""
+    converted, _ = get_converter().convert(unicodedata.normalize('NFKC', text))
+    return strip_key(converted)
+
+def canonical_keys(texts):
+    """Get the canonical keys of many names, converting them in one batch."""
+    normalized = [unicodedata.normalize('NFKC', text) for text in texts]
+    converted = get_converter().convert_many(normalized)
+    return [strip_key(converted[text][0]) for text in normalized]
+
+class CanonicalIndex:
+    """Exact canonical key lookup in front of a fuzzy matcher (or the full scan when there is none)."""
+
+    def __init__(self, products, matcher=None):
+        self.matcher = matcher
+        self.products = []
+        self.known = set()
+        # canonical key -> every product with that key
+        self.keys = {}
+        self.exact_hits = 0
+        self.insert_all(products)
+
+    def __getstate__(self):
+        # Statistics are not kept with a stored index
+        state = self.__dict__.copy()
+        state['exact_hits'] = 0
+        return state
+
+    def insert_all(self, products):
+        """Add the keys of products that are not known yet, in one conversion batch."""
+        products = [p for p in dict.fromkeys(products) if p not in self.known]
+        for product, key in zip(products, canonical_keys(products)):
+            self.products.append(product)
+            self.known.add(product)
+            self.keys.setdefault(key, []).append(product)
+
+    def add(self, product):
+        """Add a new product to the keys and the fuzzy matcher."""
+        self.insert_all([product])
+        if self.matcher is not None:
+            self.matcher.add(product)
+
+    def lookup(self, text):
+        """Get the product the text stands for: itself if it is a product, else the only product with its key, or None."""
+        if text in self.known:
+            return text
+        products = self.keys.get(canonical_key(text), ())
+        return products[0] if len(products) == 1 else None
+
+    def get_sorted_matches(self, input_text, n=5):
+        """Get sorted matches, with a product of the same canonical key as the only, exact match."""
+        product = self.lookup(input_text)
+        if product is not None:
+            self.exact_hits += 1
+            return [(product, 1.0)]
+        if self.matcher is not None:
+            return self.matcher.get_sorted_matches(input_text, n)
+        return get_sorted_matches(input_text, self.products, n)
@@ -0,0 +1,134 @@
+"""SQLite product catalogue for matching_v2.
+
+The product list can be kept in a SQLite file (products.db) instead of the
+quoted .txt file. Membership checks use the table's unique index, new
+products are appended without rewriting anything, and the candidate index
+built for a matcher is stored in the file too, so later runs load it
+instead of rebuilding it until the catalogue changes.
+
+Import and export of the quoted-line .txt format:
+    python matching/catalogue.py import product_list.txt products.db
+    python matching/catalogue.py export products.db product_list.txt
+"""
+import sys
+import pickle
+import sqlite3
+import argparse
+
+CATALOGUE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Bump when the schema or the stored index format changes
+SCHEMA_VERSION = 4
+
+def is_catalogue_file(filename):
+    """Check whether a product list file is a SQLite catalogue."""
+    return filename.lower().endswith(CATALOGUE_EXTENSIONS)
+
+def read_quoted_products(filename):
+    """Read products from the quoted-line .txt format, skipping empty lines."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        products = [line.strip().strip('"\'') for line in f]
+    return [p for p in products if p]
+
+class ProductCatalogue:
+    """Product names in insertion order, with prebuilt matcher indexes."""
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS products (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS indexes (matcher TEXT PRIMARY KEY, revision INTEGER NOT NULL, data BLOB NOT NULL);
+        """)
+        if self.get_meta('schema_version') != str(SCHEMA_VERSION):
+            with self.conn:
+                self.conn.execute("DELETE FROM indexes")
+                self.set_meta('schema_version', SCHEMA_VERSION)
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def revision(self):
+        """Number that changes whenever products are added."""
+        return int(self.get_meta('revision', 0))
+
+    def load_products(self):
+        """Get every product name in insertion order."""
+        return [name for (name,) in self.conn.execute("SELECT name FROM products ORDER BY id")]
+
+    def __contains__(self, product):
+        return self.conn.execute("SELECT 1 FROM products WHERE name = ?", (product,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def add_products(self, products):
+        """Append products that are not in the catalogue yet, returning how many were added."""
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO products (name) VALUES (?)", ((p,) for p in products))
+            added = self.conn.total_changes - before
+            if added:
+                self.set_meta('revision', self.revision() + 1)
+        return added
+
+    def load_matcher(self, name, build):
+        """Load the stored index of a matcher, or build it with build() and store it if the catalogue changed."""
+        revision = self.revision()
+        row = self.conn.execute("SELECT revision, data FROM indexes WHERE matcher = ?", (name,)).fetchone()
+        if row is not None and row[0] == revision:
+            try:
+                return pickle.loads(row[1])
+            except Exception as e:
+                print(f"Warning: Could not load the stored {name} index, rebuilding it: {e}")
+        matcher = build()
+        if matcher is not None:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO indexes (matcher, revision, data) VALUES (?, ?, ?)",
+                                  (name, revision, pickle.dumps(matcher, pickle.HIGHEST_PROTOCOL)))
+        return matcher
+
+    def import_txt(self, txt_file):
+        """Add the products of a quoted-line .txt file, returning how many were new."""
+        return self.add_products(read_quoted_products(txt_file))
+
+    def export_txt(self, txt_file):
+        """Write every product to a quoted-line .txt file, returning how many were written."""
+        products = self.load_products()
+        with open(txt_file, 'w', encoding='utf-8') as f:
+            for product in products:
+                f.write(f'"{product}"\n')
+        return len(products)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export a SQLite product catalogue.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="add the products of a quoted-line .txt file")
+    import_parser.add_argument('txt_file')
+    import_parser.add_argument('db_file')
+    export_parser = commands.add_parser('export', help="write the catalogue as a quoted-line .txt file")
+    export_parser.add_argument('db_file')
+    export_parser.add_argument('txt_file')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    catalogue = ProductCatalogue(args.db_file)
+    try:
+        if args.command == 'import':
+            added = catalogue.import_txt(args.txt_file)
+            print(f"Imported {added} new products into {args.db_file} ({len(catalogue)} in total)")
+        else:
+            written = catalogue.export_txt(args.txt_file)
+            print(f"Exported {written} products to {args.txt_file}")
+    finally:
+        catalogue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Persistent match decisions for matching_v2.
+
+Every decision made for a raw product name, whether matched automatically,
+confirmed or picked by the operator, or kept as it is, is saved next to the
+product list file (product_list.txt -> product_list.decisions.json). Later
+runs apply these decisions before any scoring or prompting, so each
+misspelling is only resolved once.
+
+Decisions pointing to a product that is no longer in the product list are
+dropped when the file is loaded.
+"""
+import os
+import json
+import tempfile
+
+# Bump when the meaning of the saved decisions changes, so old files are ignored
+DECISIONS_VERSION = 1
+
+def get_decisions_file(product_list_file):
+    """Get the decision file kept next to a product list file."""
+    return os.path.splitext(product_list_file)[0] + ".decisions.json"
+
+def load_decisions(decisions_file, product_list):
+    """Load {raw value: product, or None to keep the original} saved by earlier runs."""
+    if not os.path.exists(decisions_file):
+        return {}
+    try:
+        with open(decisions_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read match decisions '{decisions_file}': {e}")
+        return {}
+    if data.get("version") != DECISIONS_VERSION:
+        return {}
+
+    products = set(product_list)
+    decisions = {}
+    removed = 0
+    for value, product in data["decisions"].items():
+        if product is not None and product not in products:
+            removed += 1
+            continue
+        decisions[value] = product
+    print(f"Loaded {len(decisions)} previous match decisions from {decisions_file}")
+    if removed:
+        print(f"Dropped {removed} decisions for products no longer in the product list")
+    return decisions
+
+def save_decisions(decisions, decisions_file):
+    """Write the match decisions to disk.
+
+    The decisions are written to a temporary file of their own and then moved
+    into place, so runs saving against the same product list never share a
+    temporary file.
+    """
+    data = {"version": DECISIONS_VERSION, "decisions": decisions}
+    directory = os.path.dirname(os.path.abspath(decisions_file))
+    fd, temp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(decisions_file) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=0)
+        os.replace(temp_file, decisions_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
@@ -0,0 +1,71 @@
+"""Candidate matchers for matching_v2 and parallel scoring of distinct values.
+
+Every matcher has get_sorted_matches(text, n) and add(product), and sits
+behind a CanonicalIndex that resolves exact canonical key matches first. Distinct
+values can be scored in a pool of worker processes, each of which loads the
+product list and builds its matcher once, in its initializer.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from similarity import get_sorted_matches, TopKScorer
+from product_index import ProductIndex
+from blocking import BlockingMatcher
+from bk_tree import BKTree
+from canonical import CanonicalIndex
+
+# Candidate matchers that can be selected with --matcher
+MATCHERS = ['ngram', 'blocking', 'bktree', 'topk', 'exhaustive']
+
+# Values sent to a worker at a time, per worker
+CHUNKS_PER_WORKER = 4
+
+def build_fuzzy_matcher(name, product_list):
+    """Build the selected candidate matcher, or None to score every product."""
+    if name == 'ngram':
+        return ProductIndex(product_list)
+    if name == 'blocking':
+        return BlockingMatcher(product_list)
+    if name == 'bktree':
+        return BKTree(product_list)
+    if name == 'topk':
+        return TopKScorer(product_list)
+    return None
+
+def build_matcher(name, product_list):
+    """Build the selected candidate matcher behind the canonical key lookup."""
+    return CanonicalIndex(product_list, build_fuzzy_matcher(name, product_list))
+
+def get_matches(cleaned_text, product_list, matcher=None):
+    """Get the sorted (product, similarity) matches of a value from the matcher or the full list."""
+    if matcher is not None:
+        return matcher.get_sorted_matches(cleaned_text)
+    return get_sorted_matches(cleaned_text, product_list)
+
+# Product list and matcher of each worker process, set by init_worker()
+_worker_products = None
+_worker_matcher = None
+
+def init_worker(matcher_name, product_list):
+    """Load the product list and build the matcher of a worker process."""
+    global _worker_products, _worker_matcher
+    _worker_products = product_list
+    _worker_matcher = build_matcher(matcher_name, product_list)
+
+def score_in_worker(values):
+    """Score a chunk of values in a worker process."""
+    return [get_matches(value, _worker_products, _worker_matcher) for value in values]
+
+def score_values(values, product_list, matcher_name, matcher=None, workers=1):
+    """Get {value: sorted matches} for distinct values, scoring them in worker processes if workers > 1."""
+    values = list(values)
+    if workers <= 1 or len(values) < 2:
+        return {value: get_matches(value, product_list, matcher) for value in values}
+
+    workers = min(workers, len(values))
+    chunk_size = max(1, len(values) // (workers * CHUNKS_PER_WORKER))
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(matcher_name, list(product_list))) as pool:
+        for chunk, chunk_matches in zip(chunks, pool.map(score_in_worker, chunks)):
+            results.update(zip(chunk, chunk_matches))
+    return results
@@ -1,6 +1,19 @@
 import os
+import sys
 import openpyxl
-from difflib import SequenceMatcher
+from collections import Counter
+
+# Make the shared modules in the repository root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from JobSpec import parse_job, check_text_settings, parse_fraction, parse_worker_count
+from matchers import MATCHERS, build_matcher, get_matches, score_values
+from decisions import get_decisions_file, load_decisions, save_decisions
+from review import build_review_row, write_review_file, read_review_file, parse_decision
+from catalogue import ProductCatalogue, is_catalogue_file, read_quoted_products
+
+# Similarity at which a match is applied without asking
+AUTO_ACCEPT_THRESHOLD = 0.85
 
 # Predefined product list
 PRODUCT_LIST = []
@@ -42,15 +55,6 @@ def get_output_file_details(default_directory):
     
     return full_output_path
 
-def similarity_ratio(a, b):
-    """Calculate similarity ratio between two strings."""
-    return SequenceMatcher(None, a, b).ratio()
-
-def get_sorted_matches(input_text, products, n=5):
-    """Get sorted matches with similarity ratios."""
-    similarities = [(p, similarity_ratio(input_text, p)) for p in products]
-    return sorted(similarities, key=lambda x: x[1], reverse=True)[:n]
-
 def ask_for_confirmation(input_text, match, similarity):
     """Ask user to confirm if the matched product is correct."""
     print(f"\nOriginal product name: {input_text}")
@@ -84,8 +88,11 @@ def select_from_list(input_text, matches):
             pass
         print(f"Please enter a number between 0 and {len(matches)}")
 
-def find_closest_match(input_text, product_list, threshold=0.6):
-    """Find the closest matching product name with user confirmation."""
+def find_closest_match(input_text, product_list, threshold=0.6, matcher=None, matches=None):
+    """Find the closest matching product name with user confirmation.
+
+    matches can hold the value's sorted matches if they were already scored.
+    """
     if not input_text or not isinstance(input_text, str):
         return None
     
@@ -94,7 +101,8 @@ def find_closest_match(input_text, product_list, threshold=0.6):
         return None
     
     # Get sorted matches
-    matches = get_sorted_matches(cleaned_text, product_list)
+    if matches is None:
+        matches = get_matches(cleaned_text, product_list, matcher)
     
     if not matches:
         return None
@@ -102,7 +110,7 @@ def find_closest_match(input_text, product_list, threshold=0.6):
     best_match, similarity = matches[0]
     
     # If similarity is 85% or higher, return match directly
-    if similarity >= 0.85:
+    if similarity >= AUTO_ACCEPT_THRESHOLD:
         print(f"\nMatch found: {cleaned_text}")
         return best_match
     
@@ -114,33 +122,38 @@ def find_closest_match(input_text, product_list, threshold=0.6):
     # If similarity is low or user rejected the first match, show options list
     return select_from_list(cleaned_text, matches)
 
+def read_product_list(filename):
+    """Read the products of a .txt product list or a SQLite catalogue."""
+    if is_catalogue_file(filename):
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(filename)
+        catalogue = ProductCatalogue(filename)
+        try:
+            return catalogue.load_products()
+        finally:
+            catalogue.close()
+    return read_quoted_products(filename)
+
 def get_product_list_file(default_directory):
     """Prompt user to input the name of the product list file."""
     while True:
-        input_file = input("Enter the name of the product list file (with .txt extension): ")
+        input_file = input("Enter the name of the product list file (.txt, or .db for a product catalogue): ")
         full_path = os.path.join(default_directory, input_file)
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                # Try to read the file to verify it exists and is readable
-                products = [line.strip().strip('"\'') for line in f.readlines()]
-                products = [p for p in products if p]
-                if not products:
-                    print("Warning: File is empty")
-                return full_path, products
+            # Try to read the file to verify it exists and is readable
+            products = read_product_list(full_path)
+            if not products:
+                print("Warning: File is empty")
+            return full_path, products
         except FileNotFoundError:
             print(f"File '{full_path}' not found. Please try again.")
         except Exception as e:
             print(f"Error reading file: {e}")
 
 def load_product_list(filename):
-    """Load product list from txt file."""
+    """Load product list from txt file or SQLite catalogue."""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            # 讀取每行，去除引號和空白
-            products = [line.strip().strip('"\'') for line in f.readlines()]
-            # 過濾掉空行
-            products = [p for p in products if p]
-        return products
+        return read_product_list(filename)
     except FileNotFoundError:
         print(f"Warning: {filename} not found. Creating new file.")
         with open(filename, 'w', encoding='utf-8') as f:
@@ -149,6 +162,15 @@ def load_product_list(filename):
 
 def save_product_list(new_products, filename):
     """Save product list to txt file while preserving existing products."""
+    if is_catalogue_file(filename):
+        # The catalogue appends the new products without rewriting the others
+        catalogue = ProductCatalogue(filename)
+        try:
+            catalogue.add_products(new_products)
+        finally:
+            catalogue.close()
+        return
+
     try:
         # 讀取現有的商品列表
         with open(filename, 'r', encoding='utf-8') as f:
@@ -161,16 +183,18 @@ def save_product_list(new_products, filename):
     all_products = existing_products.copy()
     
     # 只添加不在現有列表中的新商品
+    known_products = set(existing_products)
     for product in new_products:
-        if product not in existing_products:
+        if product not in known_products:
             all_products.append(product)
+            known_products.add(product)
 
     # 保存所有商品
     with open(filename, 'w', encoding='utf-8') as f:
         for product in all_products:
             f.write(f'"{product}"\n')
 
-def handle_unmatched_items(unmatched_items, product_list_file):
+def handle_unmatched_items(unmatched_items, product_list_file, matcher=None):
     """Handle unmatched items and optionally add them to product list."""
     if not unmatched_items:
         return
@@ -184,6 +208,8 @@ def handle_unmatched_items(unmatched_items, product_list_file):
             if response in ['Y', 'N']:
                 if response == 'Y':
                     new_products.add(item)
+                    if matcher is not None:
+                        matcher.add(item)
                     print(f'Added "{item}" to product list')
                 break
             print("Please enter Y or N")
@@ -192,8 +218,25 @@ def handle_unmatched_items(unmatched_items, product_list_file):
         save_product_list(new_products, product_list_file)
         print(f"\nUpdated product list saved to {product_list_file}")
 
-def clean_product_names(input_file, column_indices, output_file, product_list_file, product_list):
-    """Clean and standardize product names in specified columns of an Excel file."""
+def score_new_values(ws, column_indices, product_list, confirmed_matches, matcher=None, matcher_name='ngram', workers=1):
+    """Count the distinct values of the columns and score the undecided ones, in worker processes if workers > 1.
+
+    Returns (cell counts by value, {value: sorted matches}).
+    """
+    counts = count_distinct_values(ws, column_indices)
+    new_values = [value for value in counts if value and value not in confirmed_matches]
+    if workers > 1 and new_values:
+        print(f"Scoring {len(new_values)} distinct values in {workers} worker processes...")
+    return counts, score_values(new_values, product_list, matcher_name, matcher, workers)
+
+def clean_product_names(input_file, column_indices, output_file, product_list_file, product_list, matcher=None,
+                        confirmed_matches=None, decisions_file=None, matcher_name='ngram', workers=1):
+    """Clean and standardize product names in specified columns of an Excel file.
+
+    confirmed_matches holds the decisions of earlier runs; new decisions are
+    added to it and saved to decisions_file when given. With workers > 1 the
+    distinct new values are scored in worker processes before any prompt.
+    """
     wb = openpyxl.load_workbook(input_file)
     ws = wb.active
     
@@ -201,7 +244,11 @@ def clean_product_names(input_file, column_indices, output_file, product_list_fi
     total_processed = 0
     unmatched_items = set()
     # Store confirmed matches
-    confirmed_matches = {}
+    if confirmed_matches is None:
+        confirmed_matches = {}
+    scored = {}
+    if workers > 1:
+        _, scored = score_new_values(ws, column_indices, product_list, confirmed_matches, matcher, matcher_name, workers)
 
     for col in column_indices:
         # Start from row 2 (skip header)
@@ -225,7 +272,8 @@ def clean_product_names(input_file, column_indices, output_file, product_list_fi
                     continue
                 
                 # If no confirmed match exists, perform matching
-                matched_product = find_closest_match(original_value, product_list)
+                matched_product = find_closest_match(original_value, product_list, matcher=matcher,
+                                                     matches=scored.get(original_value))
                 # Store the matching result (whether matched or not)
                 confirmed_matches[original_value] = matched_product
                 
@@ -240,6 +288,8 @@ def clean_product_names(input_file, column_indices, output_file, product_list_fi
 
     # Save changes
     wb.save(output_file)
+    if decisions_file:
+        save_decisions(confirmed_matches, decisions_file)
     
     # Print results
     print(f"\nProcessing complete:")
@@ -252,25 +302,195 @@ def clean_product_names(input_file, column_indices, output_file, product_list_fi
             print(f"- {item}")
         
         # Handle unmatched items
-        handle_unmatched_items(unmatched_items, product_list_file)
+        handle_unmatched_items(unmatched_items, product_list_file, matcher)
     
     print(f"\nResults saved to: {output_file}")
 
-def main():
+def count_distinct_values(ws, column_indices):
+    """Count the cells of each stripped string value in the columns, in order of first appearance."""
+    counts = Counter()
+    for col in column_indices:
+        for (value,) in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True):
+            if isinstance(value, str):
+                counts[value.strip()] += 1
+    return counts
+
+def auto_clean_product_names(input_file, column_indices, output_file, product_list, matcher=None,
+                             confirmed_matches=None, decisions_file=None, threshold=AUTO_ACCEPT_THRESHOLD,
+                             review_file=None, matcher_name='ngram', workers=1):
+    """Clean product names without prompts, sending the values that need a decision to a review file.
+
+    Each distinct value is resolved once: by an earlier decision, or by its
+    best match if that is at least threshold similar. The other values keep
+    their original text and are written, with their top candidates, to the
+    review file. With workers > 1 the values are scored in worker processes.
+    """
+    wb = openpyxl.load_workbook(input_file)
+    ws = wb.active
+    if confirmed_matches is None:
+        confirmed_matches = {}
+
+    counts, scored = score_new_values(ws, column_indices, product_list, confirmed_matches, matcher, matcher_name, workers)
+    previous = auto_resolved = 0
+    review_rows = []
+    for value, cells in counts.items():
+        if value in confirmed_matches:
+            previous += 1
+            continue
+        if not value:
+            continue
+        matches = scored[value]
+        if matches and matches[0][1] >= threshold:
+            confirmed_matches[value] = matches[0][0]
+            auto_resolved += 1
+        else:
+            review_rows.append(build_review_row(value, cells, matches))
+
+    changes_made = 0
+    total_processed = 0
+    for col in column_indices:
+        for (cell,) in ws.iter_rows(min_row=2, min_col=col, max_col=col):
+            if isinstance(cell.value, str):
+                total_processed += 1
+                matched_product = confirmed_matches.get(cell.value.strip())
+                if matched_product is not None and cell.value != matched_product:
+                    cell.value = matched_product
+                    changes_made += 1
+
+    wb.save(output_file)
+    if decisions_file:
+        save_decisions(confirmed_matches, decisions_file)
+
+    print(f"\nProcessing complete:")
+    print(f"Total cells processed: {total_processed}")
+    print(f"Distinct values: {len(counts)} ({previous} from previous decisions, "
+          f"{auto_resolved} matched automatically, {len(review_rows)} need review)")
+    print(f"Changes made: {changes_made}")
+    if review_rows:
+        write_review_file(review_rows, review_file)
+        print(f"\n{len(review_rows)} values to review saved to: {review_file}")
+        print("Fill in the decision column and run again with --apply-review to apply them.")
+    else:
+        print("\nNo values need review.")
+    print(f"\nResults saved to: {output_file}")
+
+def apply_review_decisions(review_file, confirmed_matches, product_list_file, product_list, matcher=None):
+    """Add the decisions of a reviewed file to confirmed_matches, adding 'new' products to the product list."""
+    products = set(product_list)
+    new_products = []
+    applied = 0
+    for row_number, row in enumerate(read_review_file(review_file), 2):
+        value = (row.get('value') or '').strip()
+        if not value:
+            continue
+        try:
+            action, product = parse_decision(row, products)
+        except ValueError as e:
+            print(f"Warning: Skipping row {row_number} ('{value}') of {review_file}: {e}")
+            continue
+        if action == 'skip':
+            continue
+        if action == 'new' and value not in products:
+            new_products.append(value)
+            products.add(value)
+            product_list.append(value)
+            if matcher is not None:
+                matcher.add(value)
+        confirmed_matches[value] = product
+        applied += 1
+
+    print(f"Applied {applied} reviewed decisions from {review_file}")
+    if new_products:
+        save_product_list(new_products, product_list_file)
+        print(f"Added {len(new_products)} new products to {product_list_file}")
+
+def get_review_file(output_file):
+    """Get the default review file next to the output file."""
+    return os.path.splitext(output_file)[0] + "_review.csv"
+
+def add_matching_arguments(parser):
+    """Add the matching options to the job command line parser."""
+    parser.add_argument('--matcher', choices=MATCHERS,
+                        help="how candidates are found: 'ngram' scores a shortlist from the n-gram index first, then any product "
+                             "whose character counts could still make the top 5 (default), "
+                             "'blocking' scores the products with the same first character and a similar length, "
+                             "'bktree' scores the 50 products nearest by edit distance, "
+                             "'topk' scores every product but skips those that cannot make the top 5, "
+                             "'exhaustive' scores every product")
+    parser.add_argument('--auto-threshold', type=float,
+                        help="match without prompts: apply matches at least this similar (e.g. 0.85) "
+                             "and write the other values to a review file")
+    parser.add_argument('--review-file',
+                        help="review file (.csv or .xlsx) for the auto mode (default: <output name>_review.csv)")
+    parser.add_argument('--apply-review',
+                        help="reviewed file whose decisions are applied before matching (implies the auto mode)")
+    parser.add_argument('--workers', type=int,
+                        help="number of worker processes scoring the distinct values (default: 1)")
+
+def check_matching_settings(job):
+    """Check the matching options of a job, raising ValueError naming the first bad one."""
+    matcher_name = job.get('matcher', 'ngram')
+    if matcher_name not in MATCHERS:
+        raise ValueError(f"Unknown matcher '{matcher_name}'. Please use one of: {', '.join(MATCHERS)}")
+    check_text_settings(job, ['review_file', 'apply_review'])
+    if job.get('auto_threshold') is not None:
+        job['auto_threshold'] = parse_fraction(job['auto_threshold'], 'auto_threshold')
+    job['workers'] = parse_worker_count(job.get('workers', 1))
+
+def main(argv=None):
+    # Settings come from a job spec or flags when given, otherwise from prompts
+    job = parse_job(sys.argv[1:] if argv is None else argv,
+                    "Standardize product names in the given columns against a product list.",
+                    product_list=True, add_arguments=add_matching_arguments, check_settings=check_matching_settings)
     default_directory = os.getcwd()
     
     # Load product list from file
-    product_list_file, product_list = get_product_list_file(default_directory)
+    if job is not None:
+        product_list_file = job['product_list']
+        product_list = load_product_list(product_list_file)
+    else:
+        product_list_file, product_list = get_product_list_file(default_directory)
     
     if not product_list:
         print("Error: Product list is empty. Please check your input file")
         return
     
-    input_excel_file = get_input_file(default_directory)
-    columns_to_clean = get_columns_to_clean()
-    output_excel_file = get_output_file_details(default_directory)
+    if job is not None:
+        input_excel_file = job['input']
+        columns_to_clean = job['columns']
+        output_excel_file = job['output_file']
+    else:
+        input_excel_file = get_input_file(default_directory)
+        columns_to_clean = get_columns_to_clean()
+        output_excel_file = get_output_file_details(default_directory)
     
-    clean_product_names(input_excel_file, columns_to_clean, output_excel_file, product_list_file, product_list)
+    matcher_name = job.get('matcher', 'ngram') if job is not None else 'ngram'
+    workers = job['workers'] if job is not None else 1
+    if is_catalogue_file(product_list_file):
+        # Load the index stored in the catalogue unless products changed since it was built
+        catalogue = ProductCatalogue(product_list_file)
+        try:
+            matcher = catalogue.load_matcher(matcher_name, lambda: build_matcher(matcher_name, product_list))
+        finally:
+            catalogue.close()
+    else:
+        matcher = build_matcher(matcher_name, product_list)
+    decisions_file = get_decisions_file(product_list_file)
+    confirmed_matches = load_decisions(decisions_file, product_list)
+
+    if job is not None and (job.get('auto_threshold') is not None or job.get('apply_review')):
+        threshold = job.get('auto_threshold')
+        if threshold is None:
+            threshold = AUTO_ACCEPT_THRESHOLD
+        if job.get('apply_review'):
+            apply_review_decisions(job['apply_review'], confirmed_matches, product_list_file, product_list, matcher)
+        review_file = job.get('review_file') or get_review_file(output_excel_file)
+        auto_clean_product_names(input_excel_file, columns_to_clean, output_excel_file, product_list, matcher,
+                                 confirmed_matches, decisions_file, threshold, review_file, matcher_name, workers)
+        return
+
+    clean_product_names(input_excel_file, columns_to_clean, output_excel_file, product_list_file, product_list, matcher,
+                        confirmed_matches, decisions_file, matcher_name, workers)
 
 if __name__ == "__main__":
     try:
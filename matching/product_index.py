@@ -0,0 +1,146 @@
+"""Character n-gram index for shortlisting product name candidates.
+
+Scoring a cell against every product is O(catalogue). The index keeps, for
+every character bigram and trigram, the products that contain it, which
+suits CJK names where words are not separated by spaces. A query first
+scores the products sharing the most n-grams with it (ranked by Dice
+overlap), so the top matches are usually found at once.
+
+The result is still the same as the full scan's: the index also keeps each
+product's character counts, from which the quick_ratio() upper bound of
+every product sharing a character with the query is computed without a
+SequenceMatcher. The other products are then checked in order of that
+bound, and scoring stops as soon as no bound can beat the n-th best score.
+Products sharing no character score 0 and only fill up short lists.
+"""
+import heapq
+from collections import defaultdict, Counter
+from similarity import similarity_ratio, pruning_stats
+
+NGRAM_SIZES = (2, 3)
+
+# Number of candidates scored first per query
+SHORTLIST_SIZE = 200
+
+def get_ngrams(text):
+    """Get the distinct character bigrams and trigrams of a text (the text itself if it is shorter)."""
+    ngrams = set()
+    for size in NGRAM_SIZES:
+        ngrams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    if not ngrams and text:
+        ngrams.add(text)
+    return ngrams
+
+class ProductIndex:
+    """N-gram inverted index over a product list."""
+
+    def __init__(self, products, shortlist_size=SHORTLIST_SIZE):
+        self.shortlist_size = shortlist_size
+        self.products = []
+        self.ngram_counts = []
+        # n-gram -> positions of the products containing it
+        self.postings = defaultdict(list)
+        # (character, k) -> positions of the products containing the character at least k times
+        self.char_postings = defaultdict(list)
+        self.known = set()
+        for product in products:
+            self.insert(product)
+
+    def insert(self, product):
+        """Index a product at the end of the list."""
+        position = len(self.products)
+        ngrams = get_ngrams(product)
+        self.products.append(product)
+        self.ngram_counts.append(len(ngrams))
+        self.known.add(product)
+        for ngram in ngrams:
+            self.postings[ngram].append(position)
+        for char, count in Counter(product).items():
+            for k in range(1, count + 1):
+                self.char_postings[char, k].append(position)
+
+    def add(self, product):
+        """Add a new product to the index, ignoring products already in it."""
+        if product not in self.known:
+            self.insert(product)
+
+    def shortlist_positions(self, query):
+        """Get the positions of the products sharing the most n-grams with the query, best overlap first."""
+        query_ngrams = get_ngrams(query)
+        shared = Counter()
+        for ngram in query_ngrams:
+            shared.update(self.postings.get(ngram, ()))
+
+        # Rank by Dice overlap so long products do not crowd out close matches
+        def overlap(position):
+            return 2 * shared[position] / (len(query_ngrams) + self.ngram_counts[position])
+        return sorted(shared, key=overlap, reverse=True)[:self.shortlist_size]
+
+    def candidates(self, query):
+        """Get the shortlist of products sharing the most n-grams with the query, in list order."""
+        return [self.products[position] for position in sorted(self.shortlist_positions(query))]
+
+    def common_chars(self, query):
+        """Get {position: number of characters in common with the query} for the products sharing any."""
+        common = Counter()
+        for char, query_count in Counter(query).items():
+            for k in range(1, query_count + 1):
+                common.update(self.char_postings.get((char, k), ()))
+        return common
+
+    def get_sorted_matches(self, input_text, n=5):
+        """Get the same sorted matches with similarity ratios as the full scan, scoring the shortlist first."""
+        if n <= 0:
+            return []
+        # Min-heap of (score, -position, product): the root is the n-th best so
+        # far, and on equal scores the later product ranks lower, as in a stable sort
+        heap = []
+        scored = set()
+
+        def score(position):
+            product = self.products[position]
+            entry = (similarity_ratio(input_text, product), -position, product)
+            scored.add(position)
+            pruning_stats['scored'] += 1
+            if len(heap) < n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        for position in self.shortlist_positions(input_text):
+            score(position)
+
+        common = self.common_chars(input_text)
+        input_length = len(input_text)
+
+        def bound(position):
+            # quick_ratio(): no more characters can match than the two have in common
+            total = input_length + len(self.products[position])
+            return 2.0 * common[position] / total if total else 1.0
+
+        # Only products whose bound reaches the n-th best score so far can make the list
+        worst = heap[0][0] if len(heap) == n else 0.0
+        unscored = [position for position in common if position not in scored]
+        rest = sorted((position for position in unscored if bound(position) >= worst),
+                      key=lambda position: (-bound(position), position))
+        pruning_stats['quick_ratio'] += len(unscored) - len(rest)
+        for checked, position in enumerate(rest):
+            upper = bound(position)
+            if len(heap) == n:
+                if upper < heap[0][0]:
+                    # The rest are sorted by bound, so none of them can make the list
+                    pruning_stats['quick_ratio'] += len(rest) - checked
+                    break
+                if (upper, -position) <= heap[0][:2]:
+                    pruning_stats['quick_ratio'] += 1
+                    continue
+            score(position)
+
+        # Products without a character in common score 0; fill a short list in list order
+        position = 0
+        while len(heap) < n and position < len(self.products):
+            if position not in scored and position not in common:
+                score(position)
+            position += 1
+
+        return [(product, ratio) for ratio, _, product in sorted(heap, reverse=True)]
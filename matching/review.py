@@ -0,0 +1,87 @@
+"""Review queue files for matching_v2's auto-resolve mode.
+
+Product names that could not be matched automatically are written once per
+distinct value, with how many cells hold it and its top candidates, to a
+CSV or Excel file. The operator fills in the decision column:
+
+    1-5     use that candidate
+    0       keep the original value
+    new     keep the original value and add it to the product list
+    <name>  use this product from the product list
+
+and the reviewed file is applied in bulk with --apply-review. Rows with an
+empty decision stay in the queue.
+"""
+import csv
+import openpyxl
+
+CANDIDATE_COUNT = 5
+
+REVIEW_FIELDS = ['value', 'cells'] + [
+    field for i in range(1, CANDIDATE_COUNT + 1) for field in (f'candidate_{i}', f'score_{i}')
+] + ['decision']
+
+def build_review_row(value, cells, matches):
+    """Build the review row of a value from its (product, similarity) matches."""
+    row = {'value': value, 'cells': cells, 'decision': ''}
+    for i, (product, similarity) in enumerate(matches[:CANDIDATE_COUNT], 1):
+        row[f'candidate_{i}'] = product
+        row[f'score_{i}'] = round(similarity, 3)
+    return row
+
+def write_review_file(rows, review_file):
+    """Write the review queue to a CSV file, or an Excel file if the name ends in .xlsx."""
+    if review_file.lower().endswith('.xlsx'):
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Review")
+        ws.append(REVIEW_FIELDS)
+        for row in rows:
+            ws.append([row.get(field, '') for field in REVIEW_FIELDS])
+        wb.save(review_file)
+        return
+    with open(review_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field, '') for field in REVIEW_FIELDS})
+
+def cell_text(value):
+    """Get the text of a reviewed Excel cell, so a number typed as 1 reads as '1', not '1.0'."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def read_review_file(review_file):
+    """Read the rows of a reviewed CSV or Excel file as dicts of text."""
+    if review_file.lower().endswith('.xlsx'):
+        wb = openpyxl.load_workbook(review_file, read_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(name) if name is not None else '' for name in next(rows, [])]
+        records = [
+            {name: cell_text(value) for name, value in zip(header, values)}
+            for values in rows
+        ]
+        wb.close()
+        return records
+    with open(review_file, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+def parse_decision(row, products):
+    """Turn a reviewed row into ('skip' | 'keep' | 'new' | 'match', product), or raise ValueError."""
+    decision = (row.get('decision') or '').strip()
+    if not decision:
+        return 'skip', None
+    if decision == '0':
+        return 'keep', None
+    if decision.lower() == 'new':
+        return 'new', None
+    if decision.isdigit():
+        product = row.get(f'candidate_{decision}')
+        if not product:
+            raise ValueError(f"there is no candidate {decision}")
+        return 'match', product
+    if decision not in products:
+        raise ValueError(f"'{decision}' is not in the product list")
+    return 'match', decision
@@ -0,0 +1,90 @@
+"""Similarity scoring between product names.
+
+get_sorted_matches() scores every product. get_top_matches() returns the
+same list, but keeps only the best n in a heap and skips any product whose
+upper bound (the length bound of real_quick_ratio(), then quick_ratio())
+cannot beat the n-th best score found so far.
+"""
+import heapq
+from collections import Counter
+from difflib import SequenceMatcher
+
+# Products pruned or fully scored by get_top_matches(), for the benchmarks
+pruning_stats = Counter()
+
+def similarity_ratio(a, b):
+    """Calculate similarity ratio between two strings."""
+    return SequenceMatcher(None, a, b).ratio()
+
+def get_sorted_matches(input_text, products, n=5):
+    """Get sorted matches with similarity ratios."""
+    similarities = [(p, similarity_ratio(input_text, p)) for p in products]
+    return sorted(similarities, key=lambda x: x[1], reverse=True)[:n]
+
+def length_bound(a_length, b_length):
+    """Upper bound of the similarity ratio from the lengths alone (as real_quick_ratio())."""
+    total = a_length + b_length
+    return 2.0 * min(a_length, b_length) / total if total else 1.0
+
+def get_top_matches(input_text, products, n=5, matchers=None):
+    """Get the same sorted matches as get_sorted_matches(), pruning products that cannot make the top n.
+
+    matchers can hold a SequenceMatcher per product (in the same order) with
+    the product already set as the second sequence, so its preprocessing is
+    reused across queries. The input text stays the first sequence, as the
+    ratio is not symmetric.
+    """
+    if n <= 0:
+        return []
+    # Min-heap of (score, -position, product): the root is the n-th best so
+    # far, and on equal scores the later product ranks lower, as in a stable sort
+    heap = []
+    input_length = len(input_text)
+    for position, product in enumerate(products):
+        if len(heap) == n:
+            worst = heap[0][0]
+            if length_bound(input_length, len(product)) <= worst:
+                pruning_stats['length'] += 1
+                continue
+        if matchers is not None:
+            matcher = matchers[position]
+            matcher.set_seq1(input_text)
+        else:
+            matcher = SequenceMatcher(None, input_text, product)
+        if len(heap) == n and matcher.quick_ratio() <= worst:
+            pruning_stats['quick_ratio'] += 1
+            continue
+
+        pruning_stats['scored'] += 1
+        entry = (matcher.ratio(), -position, product)
+        if len(heap) < n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    return [(product, score) for score, _, product in sorted(heap, reverse=True)]
+
+class TopKScorer:
+    """Scores a query against every product, pruned to the top n, with each product's matcher kept."""
+
+    def __init__(self, products):
+        self.products = []
+        self.matchers = []
+        self.known = set()
+        for product in products:
+            self.insert(product)
+
+    def insert(self, product):
+        """Keep a product at the end of the list."""
+        self.products.append(product)
+        self.matchers.append(SequenceMatcher(None, '', product))
+        self.known.add(product)
+
+    def add(self, product):
+        """Add a new product, ignoring products already in the list."""
+        if product not in self.known:
+            self.insert(product)
+
+    def get_sorted_matches(self, input_text, n=5):
+        """Get sorted matches with similarity ratios."""
+        return get_top_matches(input_text, self.products, n, self.matchers)